@@ -0,0 +1,23 @@
+"""Submodules are imported lazily, on first attribute access, so that
+
+    import eulerlib
+    eulerlib.math2.factorize(n)
+
+only pays for the modules that are actually used.
+
+"""
+import importlib
+
+__all__ = ['collections2', 'digitdp', 'diophantine', 'dirichlet', 'helpers',
+           'math2', 'polynomial', 'profiling']
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+        __name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
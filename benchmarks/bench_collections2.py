@@ -0,0 +1,101 @@
+import random
+
+import pytest
+from eulerlib.collections2 import (AdjacencyListDigraph, BinaryHeap,
+                                   FibonacciHeap)
+
+pytest.importorskip('pytest_benchmark')
+
+large = pytest.mark.large
+
+
+def make_grid(side):
+    rng = random.Random(0)
+    g = AdjacencyListDigraph()
+    for x in range(side):
+        for y in range(side):
+            if x + 1 < side:
+                g.add(((x, y), (x + 1, y)), rng.randint(1, 9))
+                g.add(((x + 1, y), (x, y)), rng.randint(1, 9))
+            if y + 1 < side:
+                g.add(((x, y), (x, y + 1)), rng.randint(1, 9))
+                g.add(((x, y + 1), (x, y)), rng.randint(1, 9))
+    return g
+
+
+@pytest.fixture(scope='module', params=[
+    316, pytest.param(1000, marks=large)], ids=['1e5', '1e6'])
+def grid(request):
+    return make_grid(request.param)
+
+
+@pytest.mark.parametrize('queue_type', [BinaryHeap, FibonacciHeap])
+def test_dijkstra(benchmark, grid, queue_type):
+    benchmark(lambda: grid.dijkstra(queue_type(), (0, 0)))
+
+
+@pytest.mark.parametrize('queue_type', [BinaryHeap, FibonacciHeap])
+@pytest.mark.parametrize('n', [10 ** 4, 10 ** 5])
+def test_heap_add_pop(benchmark, queue_type, n):
+    rng = random.Random(0)
+    items = [(rng.random(), i) for i in range(n)]
+
+    def run():
+        q = queue_type()
+        for item in items:
+            q.add(item)
+        while q:
+            q.pop()
+    benchmark(run)
+
+
+@pytest.mark.parametrize('queue_type', [BinaryHeap, FibonacciHeap])
+@pytest.mark.parametrize('n', [10 ** 5])
+def test_heap_from_iterable_pop_many(benchmark, queue_type, n):
+    rng = random.Random(0)
+    items = [(rng.random(), i) for i in range(n)]
+    benchmark(lambda: queue_type.from_iterable(items).pop_many(n))
+
+
+def test_fibonacci_heap_meld(benchmark):
+    n = 10 ** 4
+    rng = random.Random(0)
+    items = [(rng.random(), i) for i in range(n)]
+
+    def run():
+        heaps = [FibonacciHeap.from_iterable(items[i:i + 100])
+                 for i in range(0, n, 100)]
+        q = heaps[0]
+        for h in heaps[1:]:
+            q.meld(h)
+        q.pop_many(n)
+    benchmark(run)
+
+
+@pytest.mark.parametrize('queue_type', [BinaryHeap, FibonacciHeap])
+def test_heap_decrease_key(benchmark, queue_type):
+    n = 10 ** 4
+    rng = random.Random(0)
+    keys = [rng.randrange(n, 2 * n) for _ in range(n)]
+
+    def run():
+        q = queue_type()
+        for i, k in enumerate(keys):
+            q.add((k, i))
+        for i, k in enumerate(keys):
+            q.decrease_key((k, i), (k - n, i))
+        while q:
+            q.pop()
+    benchmark(run)
+
+
+def test_strongly_connected_components(benchmark, grid):
+    benchmark(grid.strongly_connected_components)
+
+
+def test_reachability(benchmark):
+    rng = random.Random(0)
+    g = AdjacencyListDigraph()
+    for _ in range(20000):
+        g.add((rng.randrange(5000), rng.randrange(5000)))
+    benchmark(g.reachability)
@@ -0,0 +1,32 @@
+from itertools import islice
+
+import pytest
+from eulerlib.diophantine import (count_pythagorean_triples,
+                                  iter_positive_solutions,
+                                  iter_primitive_pythagorean_triples,
+                                  perimeter_histogram, solve_hyperbolic)
+
+pytest.importorskip('pytest_benchmark')
+
+large = pytest.mark.large
+
+
+@pytest.mark.parametrize('count', [50, 200])
+def test_iter_positive_solutions(benchmark, count):
+    x, m = solve_hyperbolic(1, -2, -1, -1, 1, 0)
+    benchmark(lambda: list(islice(iter_positive_solutions(x, m), count)))
+
+
+def test_iter_primitive_pythagorean_triples(benchmark):
+    benchmark(lambda: sum(1 for _ in iter_primitive_pythagorean_triples(
+        max_perimeter=10 ** 6)))
+
+
+@pytest.mark.parametrize('n', [10 ** 6, pytest.param(10 ** 8, marks=large)])
+def test_count_pythagorean_triples(benchmark, n):
+    benchmark(count_pythagorean_triples, max_perimeter=n)
+
+
+@pytest.mark.parametrize('n', [10 ** 6, pytest.param(10 ** 8, marks=large)])
+def test_perimeter_histogram(benchmark, n):
+    benchmark(perimeter_histogram, n)
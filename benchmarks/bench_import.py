@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.mark.parametrize('module', ['eulerlib', 'eulerlib.math2',
+                                    'eulerlib.collections2',
+                                    'eulerlib.dirichlet'])
+def test_import(benchmark, module):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    args = [sys.executable, '-c', 'import ' + module]
+    benchmark(lambda: subprocess.run(args, check=True, env=env))
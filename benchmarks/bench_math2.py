@@ -0,0 +1,89 @@
+import random
+
+import pytest
+from eulerlib.math2 import (factorial, factorize, is_prime, iter_primes,
+                            multinomial_coefficient, partition_table,
+                            prime_iterator, product,
+                            restricted_partition_table)
+
+pytest.importorskip('pytest_benchmark')
+
+large = pytest.mark.large
+
+
+def random_smooth_numbers(count, bits, seed=0):
+    """Return a list of random numbers with the given bit length whose
+    prime factors are all less than 2 ** 20, so that trial division
+    finishes even for 60-bit numbers.
+
+    """
+    rng = random.Random(seed)
+    primes = list(iter_primes(1 << 20))
+    numbers = []
+    while len(numbers) < count:
+        n = 1
+        while n.bit_length() < bits:
+            n *= rng.choice(primes)
+        if n.bit_length() == bits:
+            numbers.append(n)
+    return numbers
+
+
+@pytest.mark.parametrize('n', [10 ** 6, pytest.param(10 ** 7, marks=large),
+                               pytest.param(10 ** 8, marks=large)])
+def test_iter_primes(benchmark, n):
+    benchmark(lambda: sum(1 for _ in iter_primes(n)))
+
+
+@pytest.mark.parametrize('count', [10 ** 5, pytest.param(10 ** 6,
+                                                         marks=large)])
+def test_prime_iterator(benchmark, count):
+    def run():
+        it = prime_iterator()
+        for _ in range(count):
+            next(it)
+    benchmark(run)
+
+
+@pytest.mark.parametrize('bits', [40, 60])
+def test_factorize(benchmark, bits):
+    numbers = random_smooth_numbers(100, bits)
+    benchmark(lambda: [factorize(n) for n in numbers])
+
+
+def test_factorize_random(benchmark):
+    rng = random.Random(0)
+    numbers = [rng.getrandbits(40) | (1 << 39) for _ in range(20)]
+    benchmark(lambda: [factorize(n) for n in numbers])
+
+
+@pytest.mark.parametrize('bits', [32, 64, 256])
+def test_is_prime(benchmark, bits):
+    rng = random.Random(0)
+    numbers = [rng.getrandbits(bits) | 1 for _ in range(1000)]
+    benchmark(lambda: [is_prime(n) for n in numbers])
+
+
+@pytest.mark.parametrize('n', [10 ** 5, pytest.param(10 ** 6, marks=large)])
+def test_product_of_primes(benchmark, n):
+    primes = list(iter_primes(n))
+    benchmark(product, primes)
+
+
+@pytest.mark.parametrize('n', [10 ** 5, pytest.param(10 ** 6, marks=large)])
+def test_factorial(benchmark, n):
+    benchmark(factorial, n)
+
+
+def test_multinomial_coefficient(benchmark):
+    benchmark(multinomial_coefficient, 10 ** 5, [25000] * 4)
+
+
+@pytest.mark.parametrize('n', [10 ** 5, pytest.param(10 ** 6, marks=large)])
+def test_partition_table(benchmark, n):
+    benchmark(partition_table, n, 10 ** 9 + 7)
+
+
+def test_restricted_partition_table(benchmark):
+    coins = [1, 2, 5, 10, 20, 50, 100, 200]
+    benchmark(restricted_partition_table, 10 ** 6, coins, 10 ** 9 + 7)
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+from eulerlib.polynomial import (NTT_PRIMES, multiply, ntt_multiply,
+                                 series_exp)
+
+pytest.importorskip('pytest_benchmark')
+
+large = pytest.mark.large
+
+
+def random_polynomial(n, mod, seed=0):
+    rng = random.Random(seed)
+    return [rng.randrange(mod) for _ in range(n)]
+
+
+@pytest.mark.parametrize('n', [10 ** 4, 10 ** 5,
+                               pytest.param(10 ** 6, marks=large)])
+@pytest.mark.parametrize('mod', [NTT_PRIMES[0], 10 ** 9 + 7])
+def test_multiply(benchmark, n, mod):
+    a = random_polynomial(n, mod)
+    benchmark(multiply, a, a, mod)
+
+
+@pytest.mark.parametrize('mod', [NTT_PRIMES[0], 10 ** 9 + 7])
+def test_ntt_multiply(benchmark, mod):
+    a = random_polynomial(10 ** 4, mod)
+    benchmark(ntt_multiply, a, a, mod)
+
+
+@pytest.mark.parametrize('n', [10 ** 4, pytest.param(10 ** 5, marks=large)])
+def test_series_exp(benchmark, n):
+    a = random_polynomial(n, NTT_PRIMES[0])
+    a[0] = 0
+    benchmark(series_exp, a, n, NTT_PRIMES[0])
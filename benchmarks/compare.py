@@ -0,0 +1,57 @@
+"""Compare pytest-benchmark JSON results against a stored baseline.
+
+    python benchmarks/compare.py baseline.json current.json [--threshold 0.1]
+
+A benchmark regresses if its statistic (min by default, which is the
+least noisy) grew by more than the threshold fraction. The exit status is 1
+if there is any regression. Only the two JSON files are read, so it runs
+entirely offline.
+
+"""
+import argparse
+import json
+import sys
+
+
+def load(path, stat):
+    with open(path) as f:
+        data = json.load(f)
+    return dict((b['fullname'], b['stats'][stat]) for b in data['benchmarks'])
+
+
+def compare(baseline, current, threshold):
+    """Return a list of (name, old, new, ratio, regressed) for benchmarks
+    present in both baseline and current, sorted by name.
+
+    """
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        old = baseline[name]
+        new = current[name]
+        ratio = new / old if old else float('inf')
+        rows.append((name, old, new, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed slowdown as a fraction (default 0.1)')
+    parser.add_argument('--stat', default='min',
+                        choices=['min', 'max', 'mean', 'median'])
+    args = parser.parse_args(argv)
+    baseline = load(args.baseline, args.stat)
+    current = load(args.current, args.stat)
+    rows = compare(baseline, current, args.threshold)
+    for name, old, new, ratio, regressed in rows:
+        print('{0} {1:>10.6f} {2:>10.6f} {3:>6.2f}x {4}'.format(
+            'REGRESSED' if regressed else 'ok       ', old, new, ratio, name))
+    for name in sorted(baseline.keys() - current.keys()):
+        print('missing   {0}'.format(name))
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Benchmarks for eulerlib hot paths, using pytest-benchmark.
+
+Run them with something like:
+
+    python -m pytest benchmarks/bench_*.py --benchmark-json=current.json
+
+Parameters marked 'large' (e.g. sieving to 10 ** 8) are skipped unless
+--bench-large is given. Use benchmarks/compare.py to compare the JSON output
+against a stored baseline.
+
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption('--bench-large', action='store_true',
+                     help='also run the benchmarks with the largest inputs')
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'large: benchmark with a large input, run only with '
+        '--bench-large')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--bench-large'):
+        return
+    skip = pytest.mark.skip(reason='needs --bench-large')
+    for item in items:
+        if 'large' in item.keywords:
+            item.add_marker(skip)
@@ -1,4 +1,13 @@
+import os
+import sys
 from abc import ABCMeta, abstractmethod, abstractproperty
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import heapify, heappop, heappush
+from itertools import count
+
+from . import profiling
+from .helpers import optional_import
 
 
 class PriorityQueue(metaclass=ABCMeta):
@@ -28,6 +37,29 @@ class PriorityQueue(metaclass=ABCMeta):
         """Replace *old_item* with *new_item*, where *new_item* < *old_item*.
         """
 
+    @classmethod
+    def from_iterable(cls, iterable):
+        """Return a new queue containing the items of *iterable*."""
+        queue = cls()
+        queue.add_many(iterable)
+        return queue
+
+    def add_many(self, iterable):
+        """Add the items of *iterable* to the queue."""
+        for item in iterable:
+            self.add(item)
+
+    def pop_many(self, k):
+        """Remove and return the *k* smallest items in the queue, in
+        ascending order.
+
+        """
+        if k > len(self):
+            raise KeyError('pop {0} items from a queue of {1}'.format(
+                k, len(self)))
+        pop = self.pop
+        return [pop() for _ in range(k)]
+
 
 # Original code by Kevin O'Connor,
 # augmented by Tim Peters and Raymond Hettinger,
@@ -54,6 +86,23 @@ class BinaryHeap(PriorityQueue):
         items.append(item)
         self._sift_up(0, len(items) - 1)
 
+    def add_many(self, iterable):
+        # Floyd's heapify takes O(n) for the whole heap, which beats
+        # sifting up the new items one by one once there are many of them.
+        items = self._items
+        indexes_by_item = self._indexes_by_item
+        n = len(items)
+        for item in iterable:
+            if item not in indexes_by_item:
+                indexes_by_item[item] = len(items)
+                items.append(item)
+        if len(items) - n > n // 4:
+            heapify(items)
+            self._indexes_by_item = dict(zip(items, range(len(items))))
+        else:
+            for i in range(n, len(items)):
+                self._sift_up(0, i)
+
     def pop(self):
         items = self._items
         if not items:
@@ -74,6 +123,21 @@ class BinaryHeap(PriorityQueue):
             raise KeyError('peek from an empty heap')
         return items[0]
 
+    def pop_many(self, k):
+        items = self._items
+        n = len(items)
+        if k * n.bit_length() <= n:
+            return super().pop_many(k)
+        # Popping most of the heap: sort it instead. A sorted list is a
+        # valid heap, so the rest needs no heapify.
+        if k > n:
+            raise KeyError('pop {0} items from a queue of {1}'.format(k, n))
+        items.sort()
+        popped = items[:k]
+        del items[:k]
+        self._indexes_by_item = dict(zip(items, range(len(items))))
+        return popped
+
     def decrease_key(self, old_item, new_item):
         indexes_by_item = self._indexes_by_item
         if old_item not in indexes_by_item:
@@ -82,6 +146,8 @@ class BinaryHeap(PriorityQueue):
             raise KeyError('{0} in a heap'.format(new_item))
         if old_item <= new_item:
             raise ValueError('{0} <= {1}'.format(old_item, new_item))
+        if profiling.enabled:
+            profiling.increment('heap.decrease_keys')
         i = indexes_by_item.pop(old_item)
         self._items[i] = new_item
         self._sift_up(0, i)
@@ -90,6 +156,7 @@ class BinaryHeap(PriorityQueue):
         items = self._items
         indexes_by_item = self._indexes_by_item
         item = items[i]
+        origin = i
         while start < i:
             p = (i - 1) >> 1
             parent = items[p]
@@ -101,6 +168,9 @@ class BinaryHeap(PriorityQueue):
                 break
         items[i] = item
         indexes_by_item[item] = i
+        if profiling.enabled:
+            steps = (origin + 1).bit_length() - (i + 1).bit_length()
+            profiling.increment('heap.sift_steps', steps)
 
     def _sift_down(self, i):
         items = self._items
@@ -123,6 +193,9 @@ class BinaryHeap(PriorityQueue):
             c = 2 * i + 1
         items[i] = item
         indexes_by_item[item] = i
+        if profiling.enabled:
+            steps = (i + 1).bit_length() - (start + 1).bit_length()
+            profiling.increment('heap.sift_steps', steps)
         self._sift_up(start, i)
 
 
@@ -185,6 +258,8 @@ class FibonacciHeap(PriorityQueue):
             raise KeyError('{0} in a heap'.format(new_item))
         if old_item <= new_item:
             raise ValueError('{0} <= {1}'.format(old_item, new_item))
+        if profiling.enabled:
+            profiling.increment('heap.decrease_keys')
         current = trees_by_item.pop(old_item)
         current.item = new_item
         trees_by_item[new_item] = current
@@ -214,6 +289,43 @@ class FibonacciHeap(PriorityQueue):
         if parent is None and new_item < self._min.item:
             self._min = current
 
+    def meld(self, other):
+        """Move all items of the FibonacciHeap *other* into this heap,
+        leaving *other* empty.
+
+        The root lists are spliced in O(1); only the index of the items in
+        the smaller heap is copied into that of the larger one.
+
+        """
+        if other is self:
+            raise ValueError('cannot meld a heap with itself')
+        small = other._trees_by_item
+        large = self._trees_by_item
+        if len(small) > len(large):
+            small, large = large, small
+        for item in small:
+            if item in large:
+                raise KeyError('{0} in both heaps'.format(item))
+        large.update(small)
+        min = self._min
+        other_min = other._min
+        if min is None:
+            self._min = other_min
+        elif other_min is not None:
+            last = min.left
+            other_last = other_min.left
+            last.right = other_min
+            other_min.left = last
+            other_last.right = min
+            min.left = other_last
+            if other_min.item < min.item:
+                self._min = other_min
+        self._len += other._len
+        self._trees_by_item = large
+        other._len = 0
+        other._min = None
+        other._trees_by_item = {}
+
     def _add_tree(self, tree):
         min = self._min
         if min is None:
@@ -247,6 +359,7 @@ class FibonacciHeap(PriorityQueue):
         return min
 
     def _consolidate_trees(self):
+        links = 0
         trees_by_degree = {}
         start = self._min
         end = start.left
@@ -277,12 +390,15 @@ class FibonacciHeap(PriorityQueue):
                     t1.degree += 1
                     t2.parent = t1
                     merged = t1
+                    links += 1
                     del trees_by_degree[d]
                     d = merged.degree
                 trees_by_degree[d] = merged
             if current is end:
                 break
             current = next
+        if profiling.enabled:
+            profiling.increment('heap.links', links)
 
 
 class FibonacciTree(object):
@@ -297,6 +413,72 @@ class FibonacciTree(object):
         self.marked = False
 
 
+class DisjointSet(object):
+    """Disjoint-set forest (union-find) over hashable items.
+
+    Items are mapped to consecutive indexes, and parents and ranks are
+    kept in arrays indexed by them. find() uses path compression and
+    union() uses union by rank.
+
+    """
+
+    def __init__(self, iterable=()):
+        self._items = []
+        self._indexes_by_item = {}
+        self._parents = []
+        self._ranks = bytearray()
+        for item in iterable:
+            self.add(item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._indexes_by_item
+
+    def add(self, item):
+        """Add *item* to the collection as a singleton set."""
+        indexes_by_item = self._indexes_by_item
+        if item in indexes_by_item:
+            return
+        i = len(self._items)
+        indexes_by_item[item] = i
+        self._items.append(item)
+        self._parents.append(i)
+        self._ranks.append(0)
+
+    def find(self, item):
+        """Return the representative item of the set containing *item*."""
+        return self._items[self._find(self._indexes_by_item[item])]
+
+    def union(self, a, b):
+        """Merge the sets containing *a* and *b*. Return False if they are
+        already in the same set, True otherwise.
+
+        """
+        indexes_by_item = self._indexes_by_item
+        i = self._find(indexes_by_item[a])
+        j = self._find(indexes_by_item[b])
+        if i == j:
+            return False
+        ranks = self._ranks
+        if ranks[i] < ranks[j]:
+            i, j = j, i
+        self._parents[j] = i
+        if ranks[i] == ranks[j]:
+            ranks[i] += 1
+        return True
+
+    def _find(self, i):
+        parents = self._parents
+        root = i
+        while parents[root] != root:
+            root = parents[root]
+        while parents[i] != root:
+            parents[i], i = root, parents[i]
+        return root
+
+
 class WeightedGraph(metaclass=ABCMeta):
 
     @abstractproperty
@@ -327,31 +509,80 @@ class DirectedGraph(WeightedGraph):
         "Return all nodes that are directly connected by edges ending at u."
 
     def topological_sort(self):
-        prev_nodes = self.prev_nodes
-        visit = self._visit
-        lst = []
-        visited = set()
-        for u in self.nodes:
-            if not prev_nodes(u):
-                visit(u, visited, lst)
-        lst.reverse()
-        return lst
-
-    def _visit(self, u, visited, lst):
-        visit = self._visit
-        if u not in visited:
-            visited.add(u)
-            for v in self.next_nodes(u):
-                visit(v, visited, lst)
-            lst.append(u)
+        """Return a list of all nodes in topological order.
+
+        Raise ValueError if the graph has a cycle.
+
+        """
+        return list(self.iter_topological_sort())
+
+    def iter_topological_sort(self):
+        """Generate all nodes in topological order (Kahn's algorithm).
+
+        The nodes are generated as soon as all of their predecessors have
+        been generated. ValueError is raised after the last node that can be
+        ordered if the graph has a cycle.
+
+        """
+        next_nodes = self.next_nodes
+        nodes = self.nodes
+        in_degrees = dict.fromkeys(nodes, 0)
+        for u in nodes:
+            for v in next_nodes(u):
+                in_degrees[v] += 1
+        stack = [u for u, d in in_degrees.items() if not d]
+        count = 0
+        while stack:
+            u = stack.pop()
+            yield u
+            count += 1
+            for v in next_nodes(u):
+                d = in_degrees[v] - 1
+                in_degrees[v] = d
+                if not d:
+                    stack.append(v)
+        if count < len(in_degrees):
+            raise ValueError('graph has a cycle')
+
+    def dag_shortest_paths(self, *initial_nodes):
+        """Return (dist, prev) of the shortest paths from the initial nodes
+        in a directed acyclic graph, in O(V + E) time.
+
+        dist and prev have the same form as the ones dijkstra() returns,
+        but negative weights are allowed.
+
+        """
+        return self._dag_paths(initial_nodes, lambda alt, d: alt < d)
+
+    def dag_longest_paths(self, *initial_nodes):
+        """Return (dist, prev) of the longest paths from the initial nodes
+        in a directed acyclic graph, in O(V + E) time.
+
+        """
+        return self._dag_paths(initial_nodes, lambda alt, d: alt > d)
+
+    def _dag_paths(self, initial_nodes, better):
+        next_nodes = self.next_nodes
+        weight = self.weight
+        dist = dict((u, 0) for u in initial_nodes)
+        prev = dict((u, None) for u in initial_nodes)
+        for u in self.iter_topological_sort():
+            if u not in dist:
+                continue
+            d = dist[u]
+            for v in next_nodes(u):
+                alt = d + weight((u, v))
+                if v not in dist or better(alt, dist[v]):
+                    dist[v] = alt
+                    prev[v] = u
+        return dist, prev
 
     def dijkstra(self, queue, *initial_nodes):
         next_nodes = self.next_nodes
         weight = self.weight
         dist = dict((u, 0) for u in initial_nodes)
         prev = dict((u, None) for u in initial_nodes)
-        for u in initial_nodes:
-            queue.add((0, u))
+        queue.add_many((0, u) for u in initial_nodes)
         while queue:
             d, u = queue.pop()
             for v in next_nodes(u):
@@ -366,6 +597,270 @@ class DirectedGraph(WeightedGraph):
                 prev[v] = u
         return dist, prev
 
+    def shortest_path(self, queue, source, target):
+        """Return (d, path) where path is a shortest path from source to
+        target and d is its length, or None if target is unreachable.
+
+        Unlike dijkstra(), it stops as soon as target is settled.
+
+        """
+        return self.astar(queue, source, target, lambda u: 0)
+
+    def astar(self, queue, source, target, heuristic):
+        """Return (d, path) like shortest_path(), using A* search.
+
+        heuristic(u) must return a lower bound of the distance from u to
+        target that is consistent: heuristic(u) <= weight((u, v)) +
+        heuristic(v) for every edge (u, v).
+
+        """
+        next_nodes = self.next_nodes
+        weight = self.weight
+        dist = {source: 0}
+        prev = {source: None}
+        estimates = {source: heuristic(source)}
+        queue.add((estimates[source], source))
+        while queue:
+            _, u = queue.pop()
+            if u == target:
+                return dist[u], reconstruct_path(prev, u)
+            d = dist[u]
+            for v in next_nodes(u):
+                alt = d + weight((u, v))
+                if v not in dist:
+                    h = estimates[v] = heuristic(v)
+                    queue.add((alt + h, v))
+                elif alt < dist[v]:
+                    h = estimates[v]
+                    queue.decrease_key((dist[v] + h, v), (alt + h, v))
+                else:
+                    continue
+                dist[v] = alt
+                prev[v] = u
+        return None
+
+    def bidirectional_dijkstra(self, queue, reverse_queue, source, target):
+        """Return (d, path) like shortest_path(), searching forward from
+        source and backward from target at the same time.
+
+        Two empty queues of the same kind must be given.
+
+        """
+        if source == target:
+            return 0, [source]
+        weight = self.weight
+        forward_weight = weight
+        backward_weight = lambda e: weight((e[1], e[0]))
+        dists = ({source: 0}, {target: 0})
+        prevs = ({source: None}, {target: None})
+        sides = ((queue, self.next_nodes, forward_weight),
+                 (reverse_queue, self.prev_nodes, backward_weight))
+        queue.add((0, source))
+        reverse_queue.add((0, target))
+        best = None
+        meeting_node = None
+        while queue and reverse_queue:
+            if (best is not None and
+                    queue.peek()[0] + reverse_queue.peek()[0] >= best):
+                break
+            i = 0 if len(queue) <= len(reverse_queue) else 1
+            q, neighbors, w = sides[i]
+            dist = dists[i]
+            prev = prevs[i]
+            other_dist = dists[1 - i]
+            d, u = q.pop()
+            for v in neighbors(u):
+                alt = d + w((u, v))
+                if v not in dist:
+                    q.add((alt, v))
+                elif alt < dist[v]:
+                    q.decrease_key((dist[v], v), (alt, v))
+                else:
+                    continue
+                dist[v] = alt
+                prev[v] = u
+                if v in other_dist:
+                    total = alt + other_dist[v]
+                    if best is None or total < best:
+                        best = total
+                        meeting_node = v
+        if best is None:
+            return None
+        path = reconstruct_path(prevs[0], meeting_node)
+        path.pop()
+        backward_path = reconstruct_path(prevs[1], meeting_node)
+        backward_path.reverse()
+        path.extend(backward_path)
+        return best, path
+
+    def iter_shortest_path_lengths(self, sources=None, processes=None):
+        """Generate (source, dist) for each node in sources (all nodes by
+        default), where dist maps each node reachable from source to the
+        length of a shortest path to it.
+
+        The sources are sharded across a process pool of the given size
+        (os.cpu_count() by default). The graph is converted to compressed
+        sparse row arrays which the workers share through shared memory,
+        and results are generated as they complete, in no particular order.
+        If processes is 1, everything runs in the current process.
+
+        """
+        nodes, offsets, targets, weights = self._to_csr()
+        indexes = dict((u, i) for i, u in enumerate(nodes))
+        if sources is None:
+            sources = range(len(nodes))
+        else:
+            sources = [indexes[u] for u in sources]
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if processes > 1 and len(sources) > 1:
+            results = _iter_csr_dijkstra_parallel(
+                offsets, targets, weights, sources, processes)
+        else:
+            results = ((s, _csr_dijkstra(offsets, targets, weights, s))
+                       for s in sources)
+        for s, dist in results:
+            yield nodes[s], dict((nodes[v], d) for v, d in dist.items())
+
+    def floyd_warshall(self):
+        """Return (nodes, dist) where nodes is a list of all nodes and
+        dist[i][j] is the length of a shortest path from nodes[i] to
+        nodes[j] (inf if there is none), in O(V ** 3) time.
+
+        dist is a NumPy array if NumPy is available, and a list of lists
+        otherwise. Suitable only for small dense graphs.
+
+        """
+        nodes = list(self.nodes)
+        indexes = dict((u, i) for i, u in enumerate(nodes))
+        n = len(nodes)
+        weight = self.weight
+        inf = float('inf')
+        np = optional_import('numpy')
+        if np is not None:
+            dist = np.full((n, n), inf)
+            np.fill_diagonal(dist, 0)
+            for u, v in self.edges:
+                i = indexes[u]
+                j = indexes[v]
+                dist[i, j] = min(dist[i, j], weight((u, v)))
+            for k in range(n):
+                np.minimum(dist, dist[:, k, None] + dist[None, k, :],
+                           out=dist)
+            return nodes, dist
+        dist = [[inf] * n for _ in range(n)]
+        for i in range(n):
+            dist[i][i] = 0
+        for u, v in self.edges:
+            i = indexes[u]
+            j = indexes[v]
+            dist[i][j] = min(dist[i][j], weight((u, v)))
+        for k in range(n):
+            row_k = dist[k]
+            for row in dist:
+                d = row[k]
+                if d == inf:
+                    continue
+                for j, e in enumerate(row_k):
+                    if d + e < row[j]:
+                        row[j] = d + e
+        return nodes, dist
+
+    def strongly_connected_components(self):
+        """Return the strongly connected components as a list of lists of
+        nodes, in topological order: if there is an edge from a node in
+        components[i] to a node in components[j] (i != j), then i < j.
+
+        It uses an iterative version of Tarjan's algorithm, so it works on
+        graphs with long paths.
+
+        """
+        nodes, adjacency = self._to_index_lists()
+        return [[nodes[u] for u in c] for c in _tarjan(adjacency)]
+
+    def condensation(self):
+        """Return (components, dag), where components is the list of the
+        strongly connected components as strongly_connected_components()
+        returns, and dag is an AdjacencyListDigraph on the indexes of the
+        components, with an edge (i, j) if there is an edge from a node in
+        components[i] to a node in components[j] (i != j). Its weight is
+        the least weight of such edges.
+
+        Components without edges to or from other components are not nodes
+        of dag.
+
+        """
+        nodes, adjacency = self._to_index_lists()
+        components = _tarjan(adjacency)
+        index = _component_index(components, len(nodes))
+        weight = self.weight
+        weights = {}
+        for u, vs in enumerate(adjacency):
+            i = index[u]
+            for v in vs:
+                j = index[v]
+                if i != j:
+                    w = weight((nodes[u], nodes[v]))
+                    e = (i, j)
+                    if e not in weights or w < weights[e]:
+                        weights[e] = w
+        dag = AdjacencyListDigraph()
+        for e, w in weights.items():
+            dag.add(e, w)
+        return [[nodes[u] for u in c] for c in components], dag
+
+    def reachability(self):
+        """Return a Reachability answering whether a node can be reached
+        from another node.
+
+        """
+        nodes, adjacency = self._to_index_lists()
+        components = _tarjan(adjacency)
+        index = _component_index(components, len(nodes))
+        # bitsets[i] has bit j set if components[j] is reachable from
+        # components[i]. Components are visited in reverse topological
+        # order, so the successors of a component are already done.
+        bitsets = [0] * len(components)
+        for i in range(len(components) - 1, -1, -1):
+            b = 1 << i
+            for u in components[i]:
+                for v in adjacency[u]:
+                    b |= bitsets[index[v]]
+            bitsets[i] = b
+        return Reachability(
+            [[nodes[u] for u in c] for c in components],
+            dict((u, index[i]) for i, u in enumerate(nodes)), bitsets)
+
+    def _to_index_lists(self):
+        next_nodes = self.next_nodes
+        nodes = list(self.nodes)
+        indexes = dict((u, i) for i, u in enumerate(nodes))
+        adjacency = [[indexes[v] for v in next_nodes(u)] for u in nodes]
+        return nodes, adjacency
+
+    def _to_csr(self):
+        next_nodes = self.next_nodes
+        weight = self.weight
+        nodes = list(self.nodes)
+        indexes = dict((u, i) for i, u in enumerate(nodes))
+        offsets = array('q', [0])
+        targets = array('q')
+        weight_list = []
+        for u in nodes:
+            for v in next_nodes(u):
+                targets.append(indexes[v])
+                weight_list.append(weight((u, v)))
+            offsets.append(len(targets))
+        if all(isinstance(w, int) for w in weight_list):
+            try:
+                weights = array('q', weight_list)
+            except OverflowError:
+                # Too large for 64 bits; array('d') would round them.
+                weights = weight_list
+        else:
+            weights = array('d', weight_list)
+        return nodes, offsets, targets, weights
+
 
 class UndirectedGraph(WeightedGraph):
 
@@ -381,8 +876,7 @@ class UndirectedGraph(WeightedGraph):
         weights = dict((u, inf) for u in nodes)
         weights[next(iter(nodes))] = 0
         connected_nodes = {}
-        for u, w in weights.items():
-            queue.add((w, u))
+        queue.add_many((w, u) for u, w in weights.items())
         while queue:
             _, u = queue.pop()
             del weights[u]
@@ -398,6 +892,46 @@ class UndirectedGraph(WeightedGraph):
                         connected_nodes[v] = u
         return connected_nodes.items()
 
+    def kruskal(self):
+        """Return a list of the edges (u, v) of a minimum spanning forest,
+        using Kruskal's algorithm. Suitable for sparse graphs.
+
+        """
+        sets = DisjointSet(self.nodes)
+        union = sets.union
+        return [e for e in sorted(self.edges, key=self.weight) if union(*e)]
+
+    def lazy_prim(self):
+        """Return a list of the edges (u, v) of a minimum spanning forest,
+        using Prim's algorithm with lazy deletion.
+
+        Instead of decreasing keys, every edge leaving the tree is pushed
+        into a binary heap and stale ones are skipped when popped.
+
+        """
+        weight = self.weight
+        adjacent_nodes = self.adjacent_nodes
+        counter = count()
+        visited = set()
+        tree = []
+        for root in self.nodes:
+            if root in visited:
+                continue
+            visited.add(root)
+            queue = [(weight((root, v)), next(counter), root, v)
+                     for v in adjacent_nodes(root) if v not in visited]
+            heapify(queue)
+            while queue:
+                _, _, u, v = heappop(queue)
+                if v in visited:
+                    continue
+                visited.add(v)
+                tree.append((u, v))
+                for x in adjacent_nodes(v):
+                    if x not in visited:
+                        heappush(queue, (weight((v, x)), next(counter), v, x))
+        return tree
+
 
 class AdjacencyListDigraph(DirectedGraph):
 
@@ -463,12 +997,13 @@ class AdjacencyListGraph(UndirectedGraph):
         nodes.add(v)
         self._add(u, v)
         self._add(v, u)
-        self._weights[e if id(u) < id(v) else (v, u)] = w
+        weights = self._weights
+        e = (v, u) if (v, u) in weights else (u, v)
+        weights[e] = w
 
     def weight(self, e):
-        if id(e[0]) > id(e[1]):
-            e = (e[1], e[0])
-        return self._weights[e]
+        weights = self._weights
+        return weights[e] if e in weights else weights[(e[1], e[0])]
 
     def adjacent_nodes(self, u):
         adjacent_nodes = self._adjacent_nodes
@@ -480,7 +1015,195 @@ class AdjacencyListGraph(UndirectedGraph):
             neighbors.append(v)
 
 
+class Reachability(object):
+    """Reachability between the nodes of a directed graph, stored as one
+    bitset of reachable components per strongly connected component.
+
+    Every node is reachable from itself.
+
+    """
+
+    def __init__(self, components, component_index, bitsets):
+        self.components = components
+        self._component_index = component_index
+        self._bitsets = bitsets
+
+    def is_reachable(self, u, v):
+        """Return True if there is a path from u to v."""
+        index = self._component_index
+        return bool(self._bitsets[index[u]] >> index[v] & 1)
+
+    def reachable_nodes(self, u):
+        """Return a list of the nodes reachable from u."""
+        components = self.components
+        nodes = []
+        bits = bin(self._bitsets[self._component_index[u]])[:1:-1]
+        i = bits.find('1')
+        while i >= 0:
+            nodes.extend(components[i])
+            i = bits.find('1', i + 1)
+        return nodes
+
+
+def _tarjan(adjacency):
+    # Return the strongly connected components of the graph on
+    # 0, 1, ..., n - 1 given by its adjacency lists, as lists of nodes in
+    # topological order. The recursion of Tarjan's algorithm is replaced by
+    # a stack of (node, iterator over its remaining successors).
+    n = len(adjacency)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = bytearray(n)
+    stack = []
+    components = []
+    counter = 0
+    for s in range(n):
+        if index[s] >= 0:
+            continue
+        index[s] = low[s] = counter
+        counter += 1
+        stack.append(s)
+        on_stack[s] = 1
+        calls = [(s, iter(adjacency[s]))]
+        while calls:
+            u, it = calls[-1]
+            for v in it:
+                if index[v] < 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = 1
+                    calls.append((v, iter(adjacency[v])))
+                    break
+                if on_stack[v] and index[v] < low[u]:
+                    low[u] = index[v]
+            else:
+                calls.pop()
+                if calls:
+                    p = calls[-1][0]
+                    if low[u] < low[p]:
+                        low[p] = low[u]
+                if low[u] == index[u]:
+                    component = []
+                    while True:
+                        v = stack.pop()
+                        on_stack[v] = 0
+                        component.append(v)
+                        if v == u:
+                            break
+                    components.append(component)
+    # Tarjan's algorithm finds the components in reverse topological order.
+    components.reverse()
+    return components
+
+
+def _component_index(components, n):
+    index = [0] * n
+    for i, c in enumerate(components):
+        for u in c:
+            index[u] = i
+    return index
+
+
+# Arrays shared with the current worker process, set by _attach_csr().
+_csr_arrays = None
+
+
+def _csr_dijkstra(offsets, targets, weights, s):
+    dist = {s: 0}
+    queue = [(0, s)]
+    while queue:
+        d, u = heappop(queue)
+        if d > dist[u]:
+            continue
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            alt = d + weights[k]
+            if v not in dist or alt < dist[v]:
+                dist[v] = alt
+                heappush(queue, (alt, v))
+    return dist
+
+
+def _attach_csr(specs):
+    global _csr_arrays
+    from multiprocessing import shared_memory
+    blocks = []
+    views = []
+    for spec in specs:
+        if isinstance(spec, list):
+            views.append(spec)
+            continue
+        name, typecode, size = spec
+        block = shared_memory.SharedMemory(name)
+        blocks.append(block)
+        views.append(block.buf[:size].cast(typecode))
+    _csr_arrays = blocks, views
+
+
+def _csr_dijkstra_chunk(sources):
+    offsets, targets, weights = _csr_arrays[1]
+    return [(s, _csr_dijkstra(offsets, targets, weights, s))
+            for s in sources]
+
+
+def _iter_csr_dijkstra_parallel(offsets, targets, weights, sources,
+                                processes):
+    # Imported here since they are slow to import and rarely needed.
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from multiprocessing import shared_memory
+    blocks = []
+    try:
+        specs = []
+        for a in (offsets, targets, weights):
+            if isinstance(a, list):
+                # Weights that do not fit in an array are pickled to each
+                # worker instead.
+                specs.append(a)
+                continue
+            size = len(a) * a.itemsize
+            block = shared_memory.SharedMemory(create=True,
+                                               size=max(size, 1))
+            blocks.append(block)
+            block.buf[:size] = a.tobytes()
+            specs.append((block.name, a.typecode, size))
+        chunk_size = max(1, min(64, len(sources) // (processes * 4)))
+        chunks = [sources[i:i + chunk_size]
+                  for i in range(0, len(sources), chunk_size)]
+        with ProcessPoolExecutor(processes, initializer=_attach_csr,
+                                 initargs=(specs,)) as executor:
+            futures = [executor.submit(_csr_dijkstra_chunk, c)
+                       for c in chunks]
+            for future in as_completed(futures):
+                yield from future.result()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def reconstruct_path(prev, v):
+    """Return the path ending at v as a list of nodes, following the
+    predecessors in prev (as returned by dijkstra()) back to an initial node.
+
+    """
+    path = []
+    while v is not None:
+        path.append(v)
+        v = prev[v]
+    path.reverse()
+    return path
+
+
 def binary_search(a, v):
+    """Return an index i such that a[i] == v if v is in the sorted sequence
+    a, or the index where v would be inserted to keep a sorted otherwise.
+
+    If v occurs more than once, any of its indexes may be returned. The
+    result alone does not tell whether v was found; use
+    binary_search_left() when that matters.
+
+    """
     n = len(a)
     start = 0
     end = n
@@ -494,3 +1217,70 @@ def binary_search(a, v):
         else:
             start = current + 1
     return start
+
+
+def binary_search_left(a, v, lo=0, hi=None):
+    """Return the index of the first item in the sorted sequence a[lo:hi]
+    that is not less than v, or hi if there is none.
+
+    v is in a[lo:hi] if and only if the result i < hi and a[i] == v.
+
+    binary_search_left([1, 3, 3, 5], 3) --> 1
+    binary_search_left([1, 3, 3, 5], 4) --> 3
+
+    """
+    return bisect_left(a, v, lo, len(a) if hi is None else hi)
+
+
+def binary_search_right(a, v, lo=0, hi=None):
+    """Return the index of the first item in the sorted sequence a[lo:hi]
+    that is greater than v, or hi if there is none.
+
+    binary_search_right([1, 3, 3, 5], 3) --> 3
+    binary_search_right([1, 3, 3, 5], 0) --> 0
+
+    """
+    return bisect_right(a, v, lo, len(a) if hi is None else hi)
+
+
+def iter_galloping_search(a, values):
+    """Generate binary_search_left(a, v) for each v in values, which must
+    be in non-decreasing order.
+
+    Each search gallops (exponential search) forward from the previous
+    result, so m queries take O(m * log(n / m)) comparisons in total.
+
+    """
+    n = len(a)
+    i = 0
+    for v in values:
+        if i < n and a[i] < v:
+            step = 1
+            j = i + 1
+            while j < n and a[j] < v:
+                i = j
+                step <<= 1
+                j = i + step
+            i = bisect_left(a, v, i + 1, min(j, n))
+        yield i
+
+
+def batch_binary_search(a, values):
+    """Return a list of binary_search_left(a, v) for each v in values,
+    which may be in any order.
+
+    The queries are sorted and merged with a in a single galloping pass.
+    If a is a NumPy array, numpy.searchsorted() is used instead.
+
+    """
+    # If a is a NumPy array, NumPy must have been imported already.
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(a, np.ndarray):
+        return np.searchsorted(a, values).tolist()
+    values = list(values)
+    order = sorted(range(len(values)), key=values.__getitem__)
+    result = [0] * len(values)
+    found = iter_galloping_search(a, (values[k] for k in order))
+    for k, i in zip(order, found):
+        result[k] = i
+    return result
@@ -0,0 +1,322 @@
+"""Counting, summing and ranking numbers by their digits (digit DP).
+
+A DigitAutomaton reads the digits of a positive integer from the most
+significant one, without leading zeros, and accepts or rejects it. DigitDP
+counts, sums and ranks the accepted numbers <= n in O(digits * states *
+base) time, where states is the number of states reachable from the start
+state, which must be finite.
+
+    dp = DigitDP(NondecreasingDigits())
+    dp.count(10 ** 100)   # number of terms of iter_nondecreasing_digits()
+    dp.nth(1000)          # the 1000th term
+
+"""
+from abc import ABCMeta, abstractmethod
+
+from .math2 import digits
+
+
+class DigitAutomaton(metaclass=ABCMeta):
+
+    @abstractmethod
+    def start(self):
+        """Return the initial state, before any digit is read."""
+
+    @abstractmethod
+    def step(self, state, d):
+        """Return the state after reading the digit d in state, or None if
+        no number can be accepted any more.
+
+        """
+
+    @abstractmethod
+    def accept(self, state):
+        """Return True if a number ending in state is accepted."""
+
+
+class NondecreasingDigits(DigitAutomaton):
+    """Accept numbers whose digits are in non-decreasing order, like
+    math2.iter_nondecreasing_digits().
+
+    """
+
+    def start(self):
+        return 0
+
+    def step(self, state, d):
+        return d if d >= state else None
+
+    def accept(self, state):
+        return True
+
+
+class NonincreasingDigits(DigitAutomaton):
+    """Accept numbers whose digits are in non-increasing order, like
+    math2.iter_nonincreasing_digits().
+
+    """
+
+    def __init__(self, base=10):
+        self.base = base
+
+    def start(self):
+        return self.base - 1
+
+    def step(self, state, d):
+        return d if d <= state else None
+
+    def accept(self, state):
+        return True
+
+
+class PandigitalDigits(DigitAutomaton):
+    """Accept n-digit numbers containing all digits 1 to n, like
+    math2.is_pandigital().
+
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.full = (1 << n) - 1
+
+    def start(self):
+        return 0
+
+    def step(self, state, d):
+        if not 1 <= d <= self.n:
+            return None
+        bit = 1 << (d - 1)
+        return None if state & bit else state | bit
+
+    def accept(self, state):
+        return state == self.full
+
+
+class DigitSum(DigitAutomaton):
+    """Accept numbers whose digits add up to total."""
+
+    def __init__(self, total):
+        self.total = total
+
+    def start(self):
+        return 0
+
+    def step(self, state, d):
+        s = state + d
+        return s if s <= self.total else None
+
+    def accept(self, state):
+        return state == self.total
+
+
+class DigitSumModulo(DigitAutomaton):
+    """Accept numbers whose digit sum is congruent to residue modulo m."""
+
+    def __init__(self, m, residue=0):
+        self.m = m
+        self.residue = residue % m
+
+    def start(self):
+        return 0
+
+    def step(self, state, d):
+        return (state + d) % self.m
+
+    def accept(self, state):
+        return state == self.residue
+
+
+class ProductAutomaton(DigitAutomaton):
+    """Accept numbers accepted by all of the given automata."""
+
+    def __init__(self, *automata):
+        self.automata = automata
+
+    def start(self):
+        return tuple(a.start() for a in self.automata)
+
+    def step(self, state, d):
+        new_state = []
+        for a, s in zip(self.automata, state):
+            t = a.step(s, d)
+            if t is None:
+                return None
+            new_state.append(t)
+        return tuple(new_state)
+
+    def accept(self, state):
+        return all(a.accept(s) for a, s in zip(self.automata, state))
+
+
+class DigitDP(object):
+    """Count, sum and rank the positive integers accepted by an automaton."""
+
+    def __init__(self, automaton, base=10):
+        self.automaton = automaton
+        self.base = base
+        self._start = automaton.start()
+        self._transitions = self._build_transitions()
+        accept = automaton.accept
+        # _levels[r][s] = (count, sum) of the r-digit strings (leading zeros
+        # allowed) that lead from the state s to an accepting state, where
+        # sum is the sum of their values.
+        self._levels = [dict((s, (1 if accept(s) else 0, 0))
+                             for s in self._transitions)]
+
+    def _build_transitions(self):
+        step = self.automaton.step
+        base = self.base
+        transitions = {}
+        stack = [self._start]
+        while stack:
+            s = stack.pop()
+            if s in transitions:
+                continue
+            lst = []
+            for d in range(base):
+                t = step(s, d)
+                if t is not None:
+                    lst.append((d, t))
+                    if t not in transitions:
+                        stack.append(t)
+            transitions[s] = lst
+        return transitions
+
+    def _level(self, r):
+        levels = self._levels
+        base = self.base
+        while len(levels) <= r:
+            prev = levels[-1]
+            scale = base ** (len(levels) - 1)
+            level = {}
+            for s, lst in self._transitions.items():
+                count = 0
+                total = 0
+                for d, t in lst:
+                    c, x = prev[t]
+                    count += c
+                    total += d * scale * c + x
+                level[s] = (count, total)
+            levels.append(level)
+        return levels[r]
+
+    def _first_digits(self):
+        return [(d, t) for d, t in self._transitions[self._start] if d]
+
+    def _count_and_sum(self, n):
+        if n < 1:
+            return 0, 0
+        base = self.base
+        ds = digits(n, base)
+        length = len(ds)
+        count = 0
+        total = 0
+        # numbers with fewer digits than n
+        for r in range(length - 1):
+            level = self._level(r)
+            for d, t in self._first_digits():
+                c, x = level[t]
+                count += c
+                total += d * base ** r * c + x
+        # numbers with as many digits as n, sharing a prefix with n
+        transitions = self._transitions
+        s = self._start
+        prefix = 0
+        for i, nd in enumerate(ds):
+            r = length - 1 - i
+            level = self._level(r)
+            scale = base ** r
+            next_state = None
+            for d, t in transitions[s]:
+                if d >= nd:
+                    if d == nd:
+                        next_state = t
+                    break
+                if i == 0 and d == 0:
+                    continue
+                c, x = level[t]
+                count += c
+                total += (prefix * base + d) * scale * c + x
+            if next_state is None:
+                return count, total
+            s = next_state
+            prefix = prefix * base + nd
+        if self.automaton.accept(s):
+            count += 1
+            total += n
+        return count, total
+
+    def count(self, n):
+        """Return the number of accepted integers in [1, n]."""
+        return self._count_and_sum(n)[0]
+
+    def sum(self, n):
+        """Return the sum of accepted integers in [1, n]."""
+        return self._count_and_sum(n)[1]
+
+    def rank(self, x):
+        """Return the number of accepted integers <= x, which is the
+        1-based position of x among them if x itself is accepted.
+
+        """
+        return self.count(x)
+
+    def nth(self, k, max_digits=1000):
+        """Return the k-th smallest accepted integer (k >= 1).
+
+        Raise ValueError if there are less than k accepted integers with
+        at most max_digits digits.
+
+        """
+        if k < 1:
+            raise ValueError('k must be positive: {0}'.format(k))
+        base = self.base
+        for length in range(1, max_digits + 1):
+            level = self._level(length - 1)
+            c = sum(level[t][0] for d, t in self._first_digits())
+            if k > c:
+                k -= c
+                continue
+            transitions = self._transitions
+            s = self._start
+            n = 0
+            for r in range(length - 1, -1, -1):
+                level = self._level(r)
+                for d, t in transitions[s]:
+                    if n == 0 and d == 0:
+                        continue
+                    c = level[t][0]
+                    if k <= c:
+                        break
+                    k -= c
+                n = n * base + d
+                s = t
+            return n
+        raise ValueError('less than k accepted integers with at most '
+                         '{0} digits'.format(max_digits))
+
+
+def count_palindromes(n, base=10):
+    """Return the number of palindromic positive integers <= n, like
+    math2.is_palindromic() on their digits.
+
+    Palindromes cannot be recognized by an automaton with finitely many
+    states, so they are counted from the first half of n directly.
+
+    """
+    if n < 1:
+        return 0
+    ds = digits(n, base)
+    length = len(ds)
+    count = 0
+    for m in range(1, length):
+        count += (base - 1) * base ** ((m - 1) // 2)
+    half = (length + 1) // 2
+    h = 0
+    for d in ds[:half]:
+        h = h * base + d
+    count += h - base ** (half - 1)
+    mirror = ds[:half] + ds[:length // 2][::-1]
+    if mirror <= ds:
+        count += 1
+    return count
@@ -1,5 +1,8 @@
+from array import array
 from heapq import heappop, heappush
-from operator import mul
+from itertools import compress, repeat
+from math import gcd, isqrt
+from operator import add, mul
 
 
 def solve_hyperbolic(a, b, c, d, e, f):
@@ -67,3 +70,125 @@ def _push(queue, x):
 
 def _multiply_mat_vec(m, v):
     return [sum(map(mul, row, v)) for row in m]
+
+
+def _check_bounds(max_perimeter, max_hypotenuse):
+    if max_perimeter is None and max_hypotenuse is None:
+        raise ValueError('max_perimeter or max_hypotenuse must be given')
+
+
+def _within(a, b, c, max_perimeter, max_hypotenuse):
+    return ((max_perimeter is None or a + b + c <= max_perimeter) and
+            (max_hypotenuse is None or c <= max_hypotenuse))
+
+
+def iter_primitive_pythagorean_triples(max_perimeter=None,
+                                       max_hypotenuse=None):
+    """Generate the primitive Pythagorean triples (a, b, c) with a < b < c
+    and a + b + c <= max_perimeter and c <= max_hypotenuse, in no
+    particular order. At least one of the bounds must be given.
+
+    The triples are generated from (3, 4, 5) with Berggren's matrices,
+    whose children have a larger perimeter and hypotenuse than their
+    parent, so every subtree beyond the bounds is skipped.
+
+    """
+    _check_bounds(max_perimeter, max_hypotenuse)
+    stack = [(3, 4, 5)]
+    while stack:
+        a, b, c = stack.pop()
+        if not _within(a, b, c, max_perimeter, max_hypotenuse):
+            continue
+        yield (a, b, c) if a < b else (b, a, c)
+        stack.append((a - 2 * b + 2 * c, 2 * a - b + 2 * c,
+                      2 * a - 2 * b + 3 * c))
+        stack.append((a + 2 * b + 2 * c, 2 * a + b + 2 * c,
+                      2 * a + 2 * b + 3 * c))
+        stack.append((-a + 2 * b + 2 * c, -2 * a + b + 2 * c,
+                      -2 * a + 2 * b + 3 * c))
+
+
+def iter_pythagorean_triples(max_perimeter=None, max_hypotenuse=None):
+    """Generate all Pythagorean triples (a, b, c), primitive or not, with
+    a < b < c within the bounds, in no particular order.
+
+    """
+    for a, b, c in iter_primitive_pythagorean_triples(max_perimeter,
+                                                      max_hypotenuse):
+        ka, kb, kc = a, b, c
+        while _within(ka, kb, kc, max_perimeter, max_hypotenuse):
+            yield ka, kb, kc
+            ka += a
+            kb += b
+            kc += c
+
+
+def _euclid_n_values(m, max_perimeter, max_hypotenuse):
+    # n such that (m * m - n * n, 2 * m * n, m * m + n * n) is a primitive
+    # triple within the bounds: 0 < n < m, n coprime to m and of the
+    # opposite parity.
+    hi = m - 1
+    if max_perimeter is not None:
+        hi = min(hi, max_perimeter // (2 * m) - m)
+    if max_hypotenuse is not None:
+        hi = min(hi, isqrt(max(max_hypotenuse - m * m, 0)))
+    ns = range(1 + m % 2, hi + 1, 2)
+    return list(compress(ns, map((1).__eq__, map(gcd, repeat(m), ns))))
+
+
+def _iter_euclid_m_values(max_perimeter, max_hypotenuse):
+    m = 2
+    while _within(m * m - 1, 2 * m, m * m + 1, max_perimeter,
+                  max_hypotenuse):
+        yield m
+        m += 1
+
+
+def count_pythagorean_triples(max_perimeter=None, max_hypotenuse=None,
+                              primitive=False):
+    """Return the number of Pythagorean triples within the bounds, or of
+    the primitive ones if primitive is True.
+
+    The triples are counted with Euclid's formula a = m * m - n * n,
+    b = 2 * m * n, c = m * m + n * n, one value of m at a time, without
+    creating a tuple per triple.
+
+    """
+    _check_bounds(max_perimeter, max_hypotenuse)
+    total = 0
+    for m in _iter_euclid_m_values(max_perimeter, max_hypotenuse):
+        ns = _euclid_n_values(m, max_perimeter, max_hypotenuse)
+        if primitive:
+            total += len(ns)
+            continue
+        # the number of multiples of each primitive triple within the
+        # bounds
+        multiples = []
+        if max_perimeter is not None:
+            q = max_perimeter // (2 * m)
+            multiples.append(map(q.__floordiv__, map(m.__add__, ns)))
+        if max_hypotenuse is not None:
+            multiples.append(map(max_hypotenuse.__floordiv__,
+                                 map((m * m).__add__, map(mul, ns, ns))))
+        total += sum(map(min, *multiples) if len(multiples) == 2 else
+                     multiples[0])
+    return total
+
+
+def perimeter_histogram(max_perimeter, primitive=False):
+    """Return an array whose p-th item is the number of Pythagorean
+    triples with perimeter p, for 0 <= p <= max_perimeter, or of the
+    primitive ones if primitive is True.
+
+    The array takes 4 bytes per item.
+
+    """
+    hist = array('I', bytes(4 * (max_perimeter + 1)))
+    for m in _iter_euclid_m_values(max_perimeter, None):
+        ns = _euclid_n_values(m, max_perimeter, None)
+        for p in map((2 * m).__mul__, map(m.__add__, ns)):
+            if primitive:
+                hist[p] += 1
+            else:
+                hist[p::p] = array('I', map(add, hist[p::p], repeat(1)))
+    return hist
@@ -0,0 +1,328 @@
+"""Prefix sums of arithmetic functions in sublinear time.
+
+Most algorithms here only need the values of a prefix sum at the distinct
+quotients n // k (k = 1, 2, ..., n), of which there are about 2 * sqrt(n).
+They are kept in a QuotientTable, which stores them in two arrays indexed
+by v (for v <= sqrt(n)) and by n // v (for larger v).
+
+"""
+from array import array
+from itertools import accumulate
+from math import comb, isqrt
+
+from .helpers import lazy_table
+from .math2 import floor_sum, iter_primes
+
+
+class QuotientTable(object):
+    """Values of a function at the quotients n // k, stored in two arrays.
+
+    t[v] is valid only if v is one of the quotients n // k.
+
+    """
+
+    def __init__(self, n, small=None, large=None):
+        r = isqrt(n)
+        self.n = n
+        self.r = r
+        self.small = [0] * (r + 1) if small is None else small
+        self.large = [0] * (r + 1) if large is None else large
+
+    def __getitem__(self, v):
+        return self.small[v] if v <= self.r else self.large[self.n // v]
+
+    def __setitem__(self, v, value):
+        if v <= self.r:
+            self.small[v] = value
+        else:
+            self.large[self.n // v] = value
+
+    def keys(self):
+        """Return a list of the quotients n // k in ascending order."""
+        n = self.n
+        r = self.r
+        keys = list(range(1, r + 1))
+        keys.extend(n // i for i in range(r, 0, -1) if n // i > r)
+        return keys
+
+
+def iter_quotient_blocks(n, start=1):
+    """Generate (q, lo, hi) for the maximal ranges lo <= k <= hi of
+    start <= k <= n where n // k == q.
+
+    iter_quotient_blocks(10) --> (10, 1, 1) (5, 2, 2) (3, 3, 3) (2, 4, 5)
+                                 (1, 6, 10)
+
+    """
+    k = start
+    while k <= n:
+        q = n // k
+        hi = n // q
+        yield q, k, hi
+        k = hi + 1
+
+
+@lazy_table
+def _bernoulli_numbers():
+    # fractions imports decimal, which is slow to import.
+    from fractions import Fraction
+    return [Fraction(1)]
+
+
+def _bernoulli(k):
+    # Bernoulli numbers with B(1) = +1/2.
+    b = _bernoulli_numbers()
+    while len(b) <= k:
+        m = len(b)
+        b.append(1 - sum(comb(m, j) * b[j] / (m - j + 1) for j in range(m)))
+    return b[k]
+
+
+def power_sum(n, k):
+    """Return 1 ** k + 2 ** k + ... + n ** k (Faulhaber's formula).
+
+    power_sum(10, 1) --> 55
+    power_sum(10, 2) --> 385
+
+    """
+    if n <= 0:
+        return 0
+    if k == 0:
+        return n
+    if k == 1:
+        return n * (n + 1) // 2
+    s = sum(comb(k + 1, j) * _bernoulli(j) * n ** (k + 1 - j)
+            for j in range(k + 1))
+    return int(s / (k + 1))
+
+
+def dirichlet_hyperbola(n, f, f_sum, g, g_sum):
+    """Return the sum of the Dirichlet convolution (f * g)(k) for
+    1 <= k <= n in O(sqrt(n)) evaluations, where f_sum and g_sum are the
+    prefix sums of f and g.
+
+    """
+    r = isqrt(n)
+    total = sum(f(a) * g_sum(n // a) + g(a) * f_sum(n // a)
+                for a in range(1, r + 1))
+    return total - f_sum(r) * g_sum(r)
+
+
+def du_sieve(n, small_sums, g_sum, h_sum):
+    """Return a QuotientTable of S(v) = f(1) + ... + f(v) for the quotients
+    v = n // k, where f * g = h (Dirichlet convolution) with g(1) = 1, and
+    g_sum and h_sum are the prefix sums of g and h (Du's sieve).
+
+    small_sums[v] must be S(v) for all v < len(small_sums). With about
+    n ** (2 / 3) precomputed values it takes O(n ** (2 / 3)) time.
+
+    """
+    t = QuotientTable(n)
+    m = len(small_sums)
+    for v in t.keys():
+        if v < m:
+            t[v] = small_sums[v]
+            continue
+        s = h_sum(v)
+        for q, lo, hi in iter_quotient_blocks(v, 2):
+            s -= (g_sum(hi) - g_sum(lo - 1)) * (
+                small_sums[q] if q < m else t[q])
+        t[v] = s
+    return t
+
+
+def prime_power_sums(n, k=0):
+    """Return a QuotientTable of the sums of p ** k over primes p <= v for
+    the quotients v = n // k, in O(n ** (3 / 4) / log(n)) time (the first
+    part of the Min_25 sieve, also known as Lucy's algorithm).
+
+    prime_power_sums(n)[n] is the number of primes <= n, and
+    prime_power_sums(n, 1)[n] is their sum.
+
+    """
+    r = isqrt(n)
+    small = [power_sum(v, k) - 1 for v in range(r + 1)]
+    small[0] = 0
+    large = [0] + [power_sum(n // i, k) - 1 for i in range(1, r + 1)]
+    for p in range(2, r + 1):
+        sp = small[p - 1]
+        if small[p] == sp:
+            continue   # p is not prime
+        pk = p ** k
+        p2 = p * p
+        for i in range(1, min(r, n // p2) + 1):
+            d = i * p
+            large[i] -= pk * ((large[d] if d <= r else small[n // d]) - sp)
+        for v in range(r, p2 - 1, -1):
+            small[v] -= pk * (small[v // p] - sp)
+    return QuotientTable(n, small, large)
+
+
+def min25_sum(n, prime_sums, f_prime_power):
+    """Return f(1) + f(2) + ... + f(n) for a multiplicative function f
+    (the second part of the Min_25 sieve).
+
+    prime_sums must be a QuotientTable of the sums of f(p) over primes
+    p <= v for the quotients v = n // k, usually a combination of
+    prime_power_sums(), and f_prime_power(p, e) must return f(p ** e).
+
+    """
+    primes = list(iter_primes(isqrt(n) + 1))
+
+    def s(x, j):
+        # Sum of f(k) over 2 <= k <= x whose least prime factor is
+        # at least primes[j].
+        total = prime_sums[x] - (prime_sums[primes[j - 1]] if j else 0)
+        for i in range(j, len(primes)):
+            p = primes[i]
+            if p * p > x:
+                break
+            q = p
+            e = 1
+            while q * p <= x:
+                total += (f_prime_power(p, e) * s(x // q, i + 1) +
+                          f_prime_power(p, e + 1))
+                q *= p
+                e += 1
+        return total
+
+    return 1 + s(n, 0) if n >= 1 else 0
+
+
+def totients(n):
+    """Return a list of Euler's totients phi(k) for 0 <= k < n
+    (phi(0) = 0).
+
+    """
+    phi = list(range(n))
+    for p in iter_primes(n):
+        phi[p::p] = [x - x // p for x in phi[p::p]]
+    return phi
+
+
+def mobius_values(n):
+    """Return a list of the Mobius function mu(k) for 0 <= k < n
+    (mu(0) = 0).
+
+    """
+    mu = [1] * n
+    if n:
+        mu[0] = 0
+    for p in iter_primes(n):
+        mu[p::p] = [-x for x in mu[p::p]]
+        q = p * p
+        if q < n:
+            mu[q::q] = [0] * len(range(q, n, q))
+    return mu
+
+
+def _small_limit(n):
+    return min(n, int(n ** (2 / 3)), 10 ** 7) + 1
+
+
+@lazy_table
+def _small_sum_tables():
+    # Prefix sums of totients() and mobius_values() by function, kept for
+    # later calls since they take most of the time of the sieves below.
+    return {}
+
+
+def _small_sums(values, m):
+    # Return an array of at least m prefix sums of values(m).
+    tables = _small_sum_tables()
+    sums = tables.get(values)
+    if sums is None or len(sums) < m:
+        sums = tables[values] = array('q', accumulate(values(m)))
+    return sums
+
+
+def totient_sum(n):
+    """Return phi(1) + phi(2) + ... + phi(n) in about O(n ** (2 / 3)).
+
+    The sums for small values are kept in helpers.tables for later calls.
+
+    """
+    if n < 1:
+        return 0
+    small_sums = _small_sums(totients, _small_limit(n))
+    return du_sieve(n, small_sums, lambda v: v,
+                    lambda v: v * (v + 1) // 2)[n]
+
+
+def mertens(n):
+    """Return mu(1) + mu(2) + ... + mu(n) in about O(n ** (2 / 3))."""
+    if n < 1:
+        return 0
+    return mertens_table(n)[n]
+
+
+def mertens_table(n):
+    """Return a QuotientTable of M(v) = mu(1) + ... + mu(v) for the
+    quotients v = n // k (n >= 1), in about O(n ** (2 / 3)).
+
+    The sums for small values are kept in helpers.tables for later calls.
+
+    """
+    small_sums = _small_sums(mobius_values, _small_limit(n))
+    return du_sieve(n, small_sums, lambda v: v, lambda v: 1)
+
+
+def count_fractions(n, lo=(0, 1), hi=(1, 1)):
+    """Return the number of reduced fractions p / q with q <= n and
+    lo <= p / q <= hi, where lo and hi are pairs (numerator, denominator)
+    with non-negative numerators, in about O(n ** (2 / 3)).
+
+    The number F(v) of all fractions with q <= v in the interval, reduced
+    or not, is a sum of floors (floor_sum()), and the reduced ones are
+    counted by Mobius inversion of F(n) = R(n) + R(n // 2) + ..., summed
+    over the blocks of equal quotients with the Mertens function.
+
+    count_fractions(8) --> 23
+    count_fractions(8, (1, 3), (1, 2)) --> 5
+
+    """
+    a, b = lo
+    c, d = hi
+    if n < 1 or a * d > b * c:
+        return 0
+
+    def count_all(v):
+        # sum of c * q // d - ceil(a * q / b) + 1 for 1 <= q <= v
+        return floor_sum(v, d, c, c) - floor_sum(v, b, a, a + b - 1) + v
+
+    mertens_values = mertens_table(n)
+    total = 0
+    previous = 0
+    for q, k_lo, k_hi in iter_quotient_blocks(n):
+        m = mertens_values[k_hi]
+        total += (m - previous) * count_all(q)
+        previous = m
+    return total
+
+
+def divisor_count_sum(n):
+    """Return sigma_0(1) + sigma_0(2) + ... + sigma_0(n), where sigma_0(k)
+    is the number of divisors of k, in O(sqrt(n)).
+
+    """
+    r = isqrt(n)
+    return 2 * sum(n // k for k in range(1, r + 1)) - r * r
+
+
+def divisor_sum_sum(n):
+    """Return sigma_1(1) + sigma_1(2) + ... + sigma_1(n), where sigma_1(k)
+    is the sum of divisors of k, in O(sqrt(n)).
+
+    """
+    return dirichlet_hyperbola(n, lambda k: k, lambda v: v * (v + 1) // 2,
+                               lambda k: 1, lambda v: v)
+
+
+def prime_count(n):
+    """Return the number of primes <= n."""
+    return prime_power_sums(n)[n] if n >= 1 else 0
+
+
+def prime_sum(n):
+    """Return the sum of primes <= n."""
+    return prime_power_sums(n, 1)[n] if n >= 1 else 0
@@ -1,4 +1,5 @@
 import functools
+import importlib
 from itertools import islice
 
 
@@ -23,3 +24,42 @@ def memoize(f):
 
     memoized_func.cache = cache
     return memoized_func
+
+
+# Global tables built by functions decorated with lazy_table(), by name.
+tables = {}
+
+
+def lazy_table(f):
+    """Decorator for a function without arguments that builds a global
+    table. The table is built on the first call, instead of at import time,
+    and shared through the tables registry under the qualified name of the
+    function.
+
+    """
+    key = '{0}.{1}'.format(f.__module__, f.__name__)
+
+    @functools.wraps(f)
+    def get_table():
+        if key not in tables:
+            tables[key] = f()
+        return tables[key]
+
+    get_table.key = key
+    return get_table
+
+
+_optional_modules = {}
+
+
+def optional_import(name):
+    """Return the module of the given name, importing it on the first
+    call, or None if it is not installed.
+
+    """
+    if name not in _optional_modules:
+        try:
+            _optional_modules[name] = importlib.import_module(name)
+        except ImportError:
+            _optional_modules[name] = None
+    return _optional_modules[name]
@@ -1,13 +1,56 @@
-from fractions import gcd
+import os
+from bisect import bisect_right
+from collections import deque
 from functools import reduce
-from itertools import permutations
-from math import factorial, log, modf, sqrt
+from heapq import heappop, heappush
+from itertools import accumulate, chain, compress, islice, permutations
+from math import gcd, isqrt, log, modf, sqrt
 from operator import mul
 from random import randint
+from time import perf_counter
 
+from . import profiling
+from .helpers import lazy_table
 
-def product(iterable):
-    return reduce(mul, iterable, 1)
+
+_PRODUCT_CHUNK = 16
+
+
+def product(iterable, mod=None):
+    """Return the product of the elements of iterable, or 1 if it is
+    empty. If mod is given, return the product modulo mod.
+
+    Without mod, chunks of the iterable are multiplied in a balanced tree,
+    so the factors of every multiplication have similar sizes. Only
+    O(log(n)) partial products are kept in memory.
+
+    product(range(1, 6)) --> 120
+    product(range(1, 6), 7) --> 1
+
+    """
+    it = iter(iterable)
+    if mod is not None:
+        ret = 1 % mod
+        for x in it:
+            ret = ret * x % mod
+        return ret
+    # stack[i] = (level, value), where value is the product of
+    # 2 ** level chunks. Levels strictly decrease from bottom to top.
+    stack = []
+    while True:
+        chunk = list(islice(it, _PRODUCT_CHUNK))
+        if not chunk:
+            break
+        level = 0
+        x = reduce(mul, chunk)
+        while stack and stack[-1][0] == level:
+            x = stack.pop()[1] * x
+            level += 1
+        stack.append((level, x))
+    ret = 1
+    while stack:
+        ret = stack.pop()[1] * ret
+    return ret
 
 
 def digits(n, base=10):
@@ -35,6 +78,9 @@ def rdigits(n, base=10):
 
 
 def iter_rdigits(n, base=10):
+    if n.bit_length() > _DIGITS_THRESHOLD:
+        yield from _big_rdigits(n, base)
+        return
     if n == 0:
         yield 0
     while n:
@@ -43,17 +89,97 @@ def iter_rdigits(n, base=10):
 
 
 def digits_to_number(iterable, base=10):
+    digits = iterable if isinstance(iterable, (list, tuple)) else \
+        list(iterable)
+    width = _leaf_width(base)
+    if len(digits) <= width:
+        return _horner(digits, base)
+    # Convert chunks of width digits, aligned from the least significant
+    # end, and combine adjacent pairs until one value is left.
+    k = len(digits) % width
+    values = [_horner(digits[:k], base)] if k else []
+    values.extend(_horner(digits[i:i + width], base)
+                  for i in range(k, len(digits), width))
+    m = base ** width
+    while len(values) > 1:
+        if len(values) & 1:
+            values.insert(0, 0)
+        values = [values[i] * m + values[i + 1]
+                  for i in range(0, len(values), 2)]
+        m *= m
+    return values[0]
+
+
+def digital_root(n, base=10):
+    if n < base:
+        return n
+    return 1 + (n - 1) % (base - 1)
+
+
+# Numbers with more bits than this are converted to digits by divide and
+# conquer, since converting one digit at a time takes quadratic time.
+_DIGITS_THRESHOLD = 4096
+
+
+def _leaf_width(base):
+    # Number of digits converted directly, so that base ** width has
+    # about 512 bits.
+    return max(1, 512 // base.bit_length())
+
+
+def _horner(digits, base):
     n = 0
-    for d in iterable:
+    for d in digits:
         n *= base
         n += d
     return n
 
 
-def digital_root(n, base=10):
-    while n >= base:
-        n = sum(digits(n, base))
-    return n
+def _big_rdigits(n, base):
+    """Return a list of digits of n in base b notation in reversed order,
+    in subquadratic time.
+
+    Power-of-two bases are read off the binary representation. Other bases
+    split n by the powers base ** (width * 2 ** i) recursively; the pieces
+    of width digits are converted directly, with str() in base 10.
+
+    """
+    if not base & (base - 1):
+        k = base.bit_length() - 1
+        s = format(n, 'b')
+        s = '0' * (-len(s) % k) + s
+        lst = [int(s[i:i + k], 2) for i in range(0, len(s), k)]
+        lst.reverse()
+        return lst
+    width = _leaf_width(base)
+    powers = [base ** width]
+    while powers[-1] <= n:
+        powers.append(powers[-1] * powers[-1])
+    lst = []
+
+    def convert(m, i, pad):
+        # Append the digits of m < powers[i + 1], padded with zeros to
+        # width * 2 ** (i + 1) digits if pad is true.
+        if i >= 0:
+            if pad or m >= powers[i]:
+                q, r = divmod(m, powers[i])
+                convert(r, i - 1, True)
+                convert(q, i - 1, pad)
+            else:
+                convert(m, i - 1, False)
+            return
+        start = len(lst)
+        if base == 10:
+            lst.extend(map(int, reversed(str(m))) if m else ())
+        else:
+            while m:
+                m, d = divmod(m, base)
+                lst.append(d)
+        if pad:
+            lst.extend([0] * (width - (len(lst) - start)))
+
+    convert(n, len(powers) - 2, False)
+    return lst
 
 
 def is_square(n):
@@ -206,6 +332,118 @@ def iter_convergents(a0, iterator):
         d1, d0 = d0, x * d0 + d1
 
 
+def farey_neighbors(p, q, n):
+    """Return (left, right), the nearest fractions below and above p / q
+    (p >= 0, q > 0) among the reduced fractions with denominators <= n,
+    as pairs (numerator, denominator). left is None if p is 0.
+
+    If p / q is itself such a fraction, its neighbors are found with the
+    extended Euclidean algorithm. Otherwise the Stern-Brocot tree is
+    descended towards p / q, taking each run of steps in the same
+    direction at once, in O(log(n)) steps.
+
+    farey_neighbors(3, 7, 8) --> ((2, 5), (1, 2))
+    farey_neighbors(1, 3, 4) --> ((1, 4), (1, 2))
+
+    """
+    g = gcd(p, q)
+    p //= g
+    q //= g
+    if q <= n:
+        # the largest d <= n with c * q - p * d = 1 (right) and
+        # p * d - c * q = 1 (left)
+        if q == 1:
+            return (p * n - 1, n) if p else None, (p * n + 1, n)
+        r = inverse_mod(p, q)
+        d = (n - r) // q * q + r
+        left = ((p * d - 1) // q, d) if p else None
+        d = (n + r) // q * q - r
+        return left, ((p * d + 1) // q, d)
+    a, b, c, d = 0, 1, 1, 0
+    while True:
+        # Move the left bound a / b towards the right bound c / d as far as
+        # it stays below p / q, and then the other way around.
+        k = (p * b - a * q - 1) // (c * q - p * d)
+        if d:
+            k = min(k, (n - b) // d)
+        a += k * c
+        b += k * d
+        j = min((c * q - p * d - 1) // (p * b - a * q), (n - d) // b)
+        c += j * a
+        d += j * b
+        if not k and not j:
+            return (a, b), (c, d)
+
+
+def iter_farey(n, start=(0, 1), stop=(1, 1)):
+    """Generate the reduced fractions p / q with q <= n and
+    start <= p / q <= stop in ascending order, as pairs (p, q), taking
+    O(1) time per fraction (the Farey sequence of order n by default).
+
+    iter_farey(5, (1, 3), (1, 2)) --> (1, 3) (2, 5) (1, 2)
+
+    """
+    p, q = start
+    left, right = farey_neighbors(p, q, n)
+    g = gcd(p, q)
+    if q // g <= n:
+        a, b = p // g, q // g
+    else:
+        a, b = left
+    c, d = right
+    r, s = stop
+    if (a, b) != left and a * s <= r * b:
+        yield a, b
+    while c * s <= r * d:
+        yield c, d
+        k = (n + b) // d
+        a, b, c, d = c, d, k * c - a, k * d - b
+
+
+def best_rational_approximation(p, q, n):
+    """Return the reduced fraction nearest to p / q with a denominator
+    <= n, as a pair (numerator, denominator). Of two equally near
+    fractions, the one with the smaller denominator (or the smaller one
+    if the denominators are equal) is returned.
+
+    best_rational_approximation(314159, 100000, 100) --> (311, 99)
+
+    """
+    g = gcd(p, q)
+    if q // g <= n:
+        return p // g, q // g
+    (a, b), (c, d) = farey_neighbors(p, q, n)
+    # compare p / q - a / b with c / d - p / q
+    x = (p * b - a * q) * d
+    y = (c * q - p * d) * b
+    if x < y or x == y and b <= d:
+        return a, b
+    return c, d
+
+
+def floor_sum(n, m, a, b):
+    """Return the sum of (a * i + b) // m for 0 <= i < n in O(log(m))
+    time, where n >= 0 and m > 0.
+
+    floor_sum(4, 3, 2, 1) --> 0 + 1 + 1 + 2 = 4
+
+    """
+    total = 0
+    while True:
+        if a >= m or a < 0:
+            total += n * (n - 1) // 2 * (a // m)
+            a %= m
+        if b >= m or b < 0:
+            total += n * (b // m)
+            b %= m
+        y_max = a * n + b
+        if y_max < m:
+            return total
+        # Count the lattice points under the line from the other axis.
+        n, b = divmod(y_max, m)
+        m, a = a, m
+
+
 def binomial_coefficient(n, k):
     if k == 0:
         return 1
@@ -218,12 +456,83 @@ def binomial_coefficient(n, k):
     return ret
 
 
-def multinomial_coefficient(n, ks):
-    # Precondition: sum(ks) == n (not checked in this function)
-    c = factorial(n)
-    for k in ks:
-        c //= factorial(k)
-    return c
+def _legendre(n, p):
+    # Exponent of the prime p in n!.
+    e = 0
+    while n >= p:
+        n //= p
+        e += n
+    return e
+
+
+def _swing(n, primes, mod):
+    # n! / ((n // 2)!) ** 2 from the exponents of primes <= n.
+    factors = []
+    for p in islice(primes, bisect_right(primes, n)):
+        if 2 * p > n:
+            factors.append(p)
+            continue
+        e = 0
+        q = n
+        while q >= p:
+            q //= p
+            e += q & 1
+        if e:
+            factors.append(p ** e if mod is None else pow(p, e, mod))
+    return product(factors, mod)
+
+
+# n! for n < 20, the base case of factorial().
+_SMALL_FACTORIALS = tuple(accumulate(range(1, 20), mul, initial=1))
+
+
+def factorial(n, mod=None):
+    """Return n!, or n! modulo mod if mod is given.
+
+    It uses the prime swing algorithm, n! = ((n // 2)!) ** 2 * swing(n),
+    where swing(n) is computed from its prime factorization with
+    product().
+
+    factorial(10) --> 3628800
+    factorial(10, 1000) --> 800
+
+    """
+    if n < 0:
+        raise ValueError('n must be non-negative: {0}'.format(n))
+    if n < 20:
+        x = _SMALL_FACTORIALS[n]
+        return x if mod is None else x % mod
+    primes = list(iter_primes(n + 1))
+
+    def f(n):
+        if n < 20:
+            x = _SMALL_FACTORIALS[n]
+            return x if mod is None else x % mod
+        x = f(n // 2)
+        return product([x, x, _swing(n, primes, mod)], mod)
+
+    return f(n)
+
+
+def multinomial_coefficient(n, ks, mod=None):
+    """Return n! / (k1! * k2! * ...) for ks = [k1, k2, ...], or the result
+    modulo mod if mod is given. sum(ks) must be n (not checked).
+
+    The result is computed from its prime factorization, without big
+    divisions.
+
+    multinomial_coefficient(5, [2, 2, 1]) --> 30
+
+    """
+    ks = sorted((k for k in ks if k > 1), reverse=True)
+    factors = []
+    for p in iter_primes(n + 1):
+        while ks and ks[-1] < p:
+            ks.pop()
+        e = _legendre(n, p) - sum(_legendre(k, p) for k in ks)
+        if e:
+            factors.append(p ** e if mod is None else pow(p, e, mod))
+    return product(factors, mod)
 
 
 def count_permutations(iterable):
@@ -253,6 +562,141 @@ def count_permutations(iterable):
     return n
 
 
+def _generalized_pentagonals(n):
+    # (g, sign) for the generalized pentagonal numbers 0 < g <= n in
+    # ascending order, where sign is 1 for +p(k - g) and 0 for -p(k - g)
+    # in Euler's recurrence.
+    ret = []
+    k = 1
+    while True:
+        for g in (k * (3 * k - 1) // 2, k * (3 * k + 1) // 2):
+            if g > n:
+                return ret
+            ret.append((g, k & 1))
+        k += 1
+
+
+def partition_table(n, mod=None):
+    """Return a list of the numbers of partitions p(k) for 0 <= k <= n,
+    reduced modulo mod if mod is given.
+
+    It uses Euler's recurrence p(k) = p(k - 1) + p(k - 2) - p(k - 5) -
+    p(k - 7) + ..., over the generalized pentagonal numbers, in
+    O(n ** 1.5) time.
+
+    partition_table(7) --> [1, 1, 2, 3, 5, 7, 11, 15]
+
+    """
+    if n < 0:
+        return []
+    if mod is not None:
+        return _partition_table_mod(n, mod)
+    pentagonals = _generalized_pentagonals(n)
+    p = [1] + [0] * n
+    for k in range(1, n + 1):
+        s = 0
+        for g, sign in pentagonals:
+            if g > k:
+                break
+            if sign:
+                s += p[k - g]
+            else:
+                s -= p[k - g]
+        p[k] = s
+    return p
+
+
+def _partition_table_mod(n, mod):
+    # Same recurrence, but the terms p(k - g) for large g are added for
+    # blocks of k at once: the values of each block are packed into one
+    # integer with a fixed width per value, so that a sum of shifted
+    # blocks adds all of their values in one big-integer addition.
+    pentagonals = _generalized_pentagonals(n)
+    w = (mod.bit_length() + len(pentagonals).bit_length() + 7) // 8
+    bits = 8 * w
+    size = max(isqrt(n) // 2, 16)
+    mask = (1 << (bits * size)) - 1
+    p = [0] * (n + 1)
+    packed = []   # packed[j] holds p[j * size:(j + 1) * size]
+    for lo in range(0, n + 1, size):
+        sums = [0, 0]
+        near = []
+        for g, sign in pentagonals:
+            if g >= lo + size:
+                break
+            if g < size:
+                near.append((g, sign))
+                continue
+            a = lo - g
+            if a < 0:
+                x = (packed[0] << (bits * -a)) & mask
+            else:
+                j, offset = divmod(a, size)
+                x = packed[j]
+                if offset:
+                    x = ((x >> (bits * offset)) |
+                         (packed[j + 1] << (bits * (size - offset)))) & mask
+            sums[sign] += x
+        minus = sums[0].to_bytes(size * w, 'little')
+        plus = sums[1].to_bytes(size * w, 'little')
+        block = bytearray(size * w)
+        for k in range(lo, min(lo + size, n + 1)):
+            i = (k - lo) * w
+            s = (int.from_bytes(plus[i:i + w], 'little') -
+                 int.from_bytes(minus[i:i + w], 'little'))
+            for g, sign in near:
+                if g > k:
+                    break
+                if sign:
+                    s += p[k - g]
+                else:
+                    s -= p[k - g]
+            s = (s if k else 1) % mod
+            p[k] = s
+            block[i:i + w] = s.to_bytes(w, 'little')
+        packed.append(int.from_bytes(block, 'little'))
+    return p
+
+
+def partition_count(n, mod=None):
+    """Return the number of partitions of n, reduced modulo mod if mod is
+    given.
+
+    partition_count(100) --> 190569292
+
+    """
+    return partition_table(n, mod)[n] if n >= 0 else 0
+
+
+def restricted_partition_table(n, parts, mod=None):
+    """Return a list of the numbers of partitions of k for 0 <= k <= n into
+    the given part sizes, each of which may be used any number of times
+    (the number of ways to make change for k with coins of these values),
+    reduced modulo mod if mod is given.
+
+    It takes O(n) time per part size.
+
+    restricted_partition_table(10, [2, 5])[10] --> 2
+
+    """
+    parts = set(parts)
+    if any(c < 1 for c in parts):
+        raise ValueError('parts must be positive: {0}'.format(sorted(parts)))
+    if n < 0:
+        return []
+    ways = [1] + [0] * n
+    for c in parts:
+        if c > n:
+            continue
+        # Adding part c is a prefix sum over each residue class modulo c.
+        for r in range(c):
+            if mod is None:
+                ways[r::c] = accumulate(ways[r::c])
+            else:
+                ways[r::c] = [x % mod for x in accumulate(ways[r::c])]
+    return ways
+
+
 def solve_linear_congruence(a, c, m):
     c = c % m
     d = gcd(a, c)
@@ -283,24 +727,372 @@ def inverse_mod(a, m):
     return y2 % m if n == 1 else None
 
 
+def crt(residues, moduli):
+    """Return (x, m) such that x = r (mod n) for every r in residues and
+    the corresponding n in moduli, where m is the least common multiple of
+    the moduli and 0 <= x < m, or None if there is no such x. The moduli
+    need not be pairwise coprime.
+
+    crt([2, 3, 2], [3, 5, 7]) --> (23, 105)
+    crt([1, 2], [4, 6]) --> None
+
+    """
+    x = 0
+    m = 1
+    for r, n in zip(residues, moduli):
+        d = gcd(m, n)
+        if (r - x) % d:
+            return None
+        # x + m * t = r (mod n)  <=>  (m / d) * t = (r - x) / d (mod n / d)
+        n_d = n // d
+        t = (r - x) // d * inverse_mod(m // d, n_d) % n_d
+        x += m * t
+        m *= n_d
+        x %= m
+    return x, m
+
+
+def _sqrt_mod_prime(a, p):
+    # Return a square root of a modulo the prime p, or None if there is
+    # none (Tonelli-Shanks).
+    a %= p
+    if a == 0 or p == 2:
+        return a
+    if pow(a, (p - 1) // 2, p) != 1:
+        return None
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+    q = p - 1
+    s = 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:
+        z += 1
+    c = pow(z, q, p)
+    t = pow(a, q, p)
+    r = pow(a, (q + 1) // 2, p)
+    while t != 1:
+        i = 0
+        t2 = t
+        while t2 != 1:
+            t2 = t2 * t2 % p
+            i += 1
+        b = pow(c, 1 << (s - i - 1), p)
+        s = i
+        c = b * b % p
+        t = t * c % p
+        r = r * b % p
+    return r
+
+
+def _sqrt_mod_prime_power_unit(b, p, e):
+    # Return the square roots of b modulo p ** e, where b is coprime to p.
+    q = p ** e
+    if p == 2:
+        if e <= 2:
+            return [x for x in range(1, q, 2) if (x * x - b) % q == 0]
+        if b % 8 != 1:
+            return []
+        # Fix one bit of the root at a time.
+        r = 1
+        for i in range(3, e):
+            if (r * r - b) % (1 << (i + 1)):
+                r += 1 << (i - 1)
+        h = q >> 1
+        return sorted(set(x % q for x in (r, -r, r + h, h - r)))
+    r = _sqrt_mod_prime(b, p)
+    if r is None:
+        return []
+    # Hensel lifting with Newton's iteration, doubling the exponent.
+    k = p
+    while k < q:
+        k = min(k * k, q)
+        r = (r - (r * r - b) * inverse_mod(2 * r, k)) % k
+    return sorted({r, q - r})
+
+
+def _sqrt_mod_prime_power(a, p, e):
+    q = p ** e
+    a %= q
+    if a == 0:
+        step = p ** ((e + 1) // 2)
+        return list(range(0, q, step))
+    k = 0
+    while a % p == 0:
+        a //= p
+        k += 1
+    if k % 2:
+        return []
+    # x = p ** (k / 2) * y where y * y = a (mod p ** (e - k)), and y is
+    # determined modulo p ** (e - k / 2).
+    h = p ** (k // 2)
+    f = p ** (e - k)
+    return sorted(h * (y + f * t) % q
+                  for y in _sqrt_mod_prime_power_unit(a, p, e - k)
+                  for t in range(h))
+
+
+def sqrt_mod(a, n, factors=None):
+    """Return a sorted list of all x with 0 <= x < n and x * x = a (mod n).
+
+    factors, if given, must be factorize(n). The roots are found modulo
+    each prime with the Tonelli-Shanks algorithm, lifted to prime powers
+    with Hensel's lemma and combined with the Chinese remainder theorem.
+
+    sqrt_mod(2, 7) --> [3, 4]
+    sqrt_mod(4, 15) --> [2, 7, 8, 13]
+
+    """
+    if factors is None:
+        factors = _factorize_modulus(n)
+    roots = [0]
+    m = 1
+    for p, e in factors:
+        q = p ** e
+        roots_q = _sqrt_mod_prime_power(a, p, e)
+        c = inverse_mod(m, q)
+        roots = [r + m * ((s - r) * c % q) for r in roots for s in roots_q]
+        m *= q
+    return sorted(roots) if n > 1 else [0]
+
+
+def _factorize_modulus(n):
+    # factorize(), except that an odd part which is prime is recognized
+    # with a primality test, since trial division would take O(sqrt(n))
+    # time. This covers prime moduli p and p - 1 for safe primes p.
+    e = (n & -n).bit_length() - 1
+    odd = n >> e
+    # Small odd parts are factorized quickly; _miller_rabin() needs > 41.
+    if odd <= 41 or not _miller_rabin(odd):
+        return factorize(n)
+    return ([(2, e)] if e else []) + [(odd, 1)]
+
+
+def _totient_factors(factors):
+    # Return factorize(phi(n)) from factors = factorize(n).
+    exponents = {}
+    for p, e in factors:
+        if e > 1:
+            exponents[p] = exponents.get(p, 0) + e - 1
+        for q, f in _factorize_modulus(p - 1):
+            exponents[q] = exponents.get(q, 0) + f
+    return sorted(exponents.items())
+
+
+def _order_factors(a, n, totient_factors):
+    # Return the factorization of the multiplicative order of a modulo n,
+    # given the factorization of phi(n).
+    order = 1
+    for p, e in totient_factors:
+        order *= p ** e
+    ret = []
+    for p, e in totient_factors:
+        k = 0
+        while k < e and pow(a, order // p, n) == 1:
+            order //= p
+            k += 1
+        if k < e:
+            ret.append((p, e - k))
+    return ret
+
+
+def multiplicative_order(a, n):
+    """Return the least k > 0 such that a ** k = 1 (mod n), or None if a is
+    not coprime to n.
+
+    multiplicative_order(2, 7) --> 3
+
+    """
+    if gcd(a, n) != 1:
+        return None
+    if n == 1:
+        return 1
+    totient_factors = _totient_factors(_factorize_modulus(n))
+    return product(p ** e for p, e in _order_factors(a, n, totient_factors))
+
+
+def primitive_root(n):
+    """Return the least primitive root modulo n, or None if there is none
+    (n is not 1, 2, 4, p ** k or 2 * p ** k for an odd prime p).
+
+    The candidates are tested with the prime factors of phi(n), so each
+    test takes O(log(n)) multiplications per factor.
+
+    primitive_root(7) --> 3
+    primitive_root(8) --> None
+
+    """
+    if n <= 4:
+        return n - 1 if n > 1 else 0
+    factors = _factorize_modulus(n)
+    if factors[0] == (2, 1):
+        odd = factors[1:]
+    else:
+        odd = factors
+    if len(odd) != 1 or odd[0][0] == 2:
+        return None
+    totient_factors = _totient_factors(factors)
+    phi = product(q ** f for q, f in totient_factors)
+    divisors = [phi // q for q, _ in totient_factors]
+    g = 2
+    while True:
+        if gcd(g, n) == 1 and all(pow(g, d, n) != 1 for d in divisors):
+            return g
+        g += 1
+
+
+def _baby_step_giant_step(g, h, order, m, max_table):
+    # Return the least x with 0 <= x < order and g ** x = h (mod m), or
+    # None. At most max_table baby steps are stored, at the cost of more
+    # giant steps when the order is larger than max_table ** 2.
+    size = min(isqrt(order - 1) + 1, max_table)
+    table = {}
+    y = 1
+    for j in range(size):
+        if y not in table:
+            table[y] = j
+        y = y * g % m
+    factor = inverse_mod(y, m)
+    y = h % m
+    for i in range(0, order, size):
+        if y in table:
+            x = i + table[y]
+            return x if x < order else None
+        y = y * factor % m
+    return None
+
+
+def _discrete_log_coprime(a, b, m, max_table):
+    # Pohlig-Hellman: solve the problem in the subgroup of each prime power
+    # dividing the order of a, one base-p digit at a time with
+    # _baby_step_giant_step(), and combine the results with crt().
+    order_factors = _order_factors(
+        a, m, _totient_factors(_factorize_modulus(m)))
+    order = product(p ** e for p, e in order_factors)
+    residues = []
+    moduli = []
+    for p, e in order_factors:
+        q = p ** e
+        g = pow(a, order // q, m)
+        h = pow(b, order // q, m)
+        gamma = pow(g, q // p, m)
+        g_inverse = inverse_mod(g, m)
+        x = 0
+        pk = 1
+        for k in range(e):
+            hk = pow(pow(g_inverse, x, m) * h % m, q // p // pk, m)
+            d = _baby_step_giant_step(gamma, hk, p, m, max_table)
+            if d is None:
+                return None
+            x += d * pk
+            pk *= p
+        residues.append(x)
+        moduli.append(q)
+    x = crt(residues, moduli)[0]
+    return x if pow(a, x, m) == b % m else None
+
+
+def discrete_log(a, b, m, max_table=1 << 20):
+    """Return the least x >= 0 such that a ** x = b (mod m), or None if
+    there is none.
+
+    It uses the Pohlig-Hellman algorithm with baby-step giant-step in each
+    prime order subgroup, so it takes O(sqrt(p)) time for the largest
+    prime p dividing the order of a, plus the time to factorize m and
+    phi(m). Each baby-step table holds at most max_table entries.
+
+    discrete_log(3, 13, 17) --> 4
+    discrete_log(2, 3, 7) --> None
+
+    """
+    a %= m
+    b %= m
+    if m == 1:
+        return 0
+    # Remove the common factors of a and m: a ** x = b (mod m) with
+    # x >= 1 and g = gcd(a, m) becomes (a / g) * a ** (x - 1) = b / g
+    # (mod m / g).
+    k = 0
+    c = 1
+    while True:
+        g = gcd(a, m)
+        if g == 1:
+            break
+        if b == c:
+            return k
+        if b % g:
+            return None
+        b //= g
+        m //= g
+        c = c * (a // g) % m
+        k += 1
+    x = _discrete_log_coprime(a % m, b * inverse_mod(c, m) % m, m,
+                              max_table) if m > 1 else 0
+    return None if x is None else x + k
+
+
+# Residues modulo 30 that are coprime to 30. The sieves below store only
+# the numbers coprime to 30, one byte each: 30 * k + _WHEEL[j] is stored at
+# index 8 * k + j, so 30 numbers take 8 bytes instead of 15 for odd numbers.
+_WHEEL = (1, 7, 11, 13, 17, 19, 23, 29)
+_WHEEL_COUNTS = [sum(1 for r in _WHEEL if r < x) for x in range(30)]
+
+
+def _wheel_index(x):
+    """Return the index of the least number >= x that is coprime to 30."""
+    k, r = divmod(x, 30)
+    return 8 * k + _WHEEL_COUNTS[r]
+
+
+@profiling.timed('sieve')
+def _wheel_sieve(a, b, primes):
+    """Return a list of the numbers in [a, b) that are coprime to 30 and
+    have no prime factor p in primes with p * p <= the number, where
+    2, 3 and 5 in primes are ignored.
+
+    If primes contains all primes up to sqrt(b - 1), the result is the list
+    of all prime numbers in [a, b) except 2, 3 and 5.
+
+    """
+    start = _wheel_index(a)
+    size = _wheel_index(b) - start
+    if size <= 0:
+        return []
+    if profiling.enabled:
+        profiling.increment('sieve.segments')
+    sieve = bytearray([1]) * size
+    if start == 0:
+        sieve[0] = 0   # 1 is not prime
+    wheel = _WHEEL
+    counts = _WHEEL_COUNTS
+    for p in primes:
+        if p * p >= b:
+            break
+        if p < 7:
+            continue
+        # Multiples p * q with q coprime to 30 fall in the same residue
+        # class every 30 * p numbers, which is every 8 * p indexes.
+        q0 = max(p, -(-a // p))
+        step = 8 * p
+        for r in wheel:
+            x = p * (q0 + (r - q0) % 30)
+            if x < b:
+                k, m = divmod(x, 30)
+                i = 8 * k + counts[m] - start
+                sieve[i::step] = bytes(len(range(i, size, step)))
+    return [30 * (i >> 3) + wheel[i & 7]
+            for i in compress(range(start, start + size), sieve)]
+
+
 def iter_primes(n):
     """Generate all prime numbers less than n."""
     if n <= 2:
         return iter([])
-    sieve = [0, 1] * ((n + 1) >> 1)
-    sieve[1] = 0
-    sieve[2] = 1
-    if n & 1:
-        sieve.append(0)
-    i = 3
-    q = i * i
-    while q <= n:
-        if sieve[i]:
-            for j in range(q, n, i << 1):
-                sieve[j] = 0
-        i += 2
-        q += (i << 2) - 4
-    return (m for m in range(n) if sieve[m])
+    small = [p for p in (2, 3, 5) if p < n]
+    base = iter_primes(isqrt(n - 1) + 1) if n > 49 else ()
+    return chain(small, _wheel_sieve(0, n, base))
 
 
 def more_primes(primes, n):
@@ -313,26 +1105,145 @@ def more_primes(primes, n):
 
     """
     a = primes[-1] + 1
-    b = n - a
-    if b <= 0:
+    if n <= a:
         return
-    sieve = ([1, 0] if a & 1 else [0, 1]) * (b >> 1)
-    if b & 1:
-        sieve.append(a & 1)
-    prime_iter = iter(primes)
-    next(prime_iter)   # drop 2
-    for p in prime_iter:
-        q = p * p
-        if q > n:
-            break
-        k = q - a if q >= a else -(a % -p)
-        if k & 1 == a & 1:
-            k += p
-        for j in range(k, b, p << 1):
-            sieve[j] = 0
-    for b in range(b):
-        if sieve[b]:
-            primes.append(a + b)
+    primes.extend(p for p in (3, 5) if a <= p < n)
+    primes.extend(_wheel_sieve(a, n, primes))
+
+
+def iter_primes_unbounded(segment_size=1 << 20):
+    """Generate all prime numbers in ascending order, without bound.
+
+    Numbers are sieved in consecutive segments of at least segment_size
+    numbers (and at least 30 times the square root of the segment start,
+    so that every sieving prime hits each residue class of the wheel).
+    Only the sieving primes up to the square root of the end of the
+    current segment are kept, so after generating primes up to n it holds
+    O(sqrt(n)) memory, unlike prime_iterator which keeps every prime it
+    has generated.
+
+    """
+    yield from (2, 3, 5)
+    lo = 0
+    hi = segment_size
+    primes = list(iter_primes(max(isqrt(hi) + 1, 8)))
+    while 1:
+        yield from _wheel_sieve(lo, hi, primes)
+        lo = hi
+        hi = lo + max(segment_size, 30 * isqrt(lo))
+        more_primes(primes, isqrt(hi) + 1)
+
+
+def iter_primes_range(lo, hi, processes=None, segment_size=1 << 22):
+    """Generate all prime numbers in [lo, hi) in ascending order.
+
+    The range is split into segments that are sieved in a process pool of
+    the given size (os.cpu_count() by default), and the primes are
+    generated in order as the segments complete. With processes=1, or if a
+    process pool is not available, everything runs in the current process.
+
+    """
+    for primes in _iter_range_segments(lo, hi, list, processes,
+                                       segment_size):
+        yield from primes
+
+
+def count_primes_range(lo, hi, processes=None, segment_size=1 << 22):
+    """Return the number of prime numbers in [lo, hi), sieving segments in
+    parallel like iter_primes_range().
+
+    """
+    return sum(_iter_range_segments(lo, hi, len, processes, segment_size))
+
+
+def sum_primes_range(lo, hi, processes=None, segment_size=1 << 22):
+    """Return the sum of prime numbers in [lo, hi), sieving segments in
+    parallel like iter_primes_range().
+
+    """
+    return sum(_iter_range_segments(lo, hi, sum, processes, segment_size))
+
+
+def count_twin_primes_range(lo, hi, processes=None, segment_size=1 << 22):
+    """Return the number of twin primes (p, p + 2) with both p and p + 2 in
+    [lo, hi), sieving segments in parallel like iter_primes_range().
+
+    """
+    total = 0
+    last = None
+    for count, first_prime, last_prime in _iter_range_segments(
+            lo, hi, _twin_primes_summary, processes, segment_size):
+        total += count
+        if first_prime is None:
+            continue
+        if last is not None and first_prime - last == 2:
+            total += 1
+        last = last_prime
+    return total
+
+
+def _twin_primes_summary(primes):
+    count = sum(1 for p, q in zip(primes, primes[1:]) if q - p == 2)
+    if not primes:
+        return count, None, None
+    return count, primes[0], primes[-1]
+
+
+# Sieving primes of the current worker process, set by _set_base_primes().
+_base_primes = None
+
+
+def _set_base_primes(primes):
+    global _base_primes
+    _base_primes = primes
+
+
+def _sieve_range_segment(a, b, reducer, base=None):
+    primes = [p for p in (2, 3, 5) if a <= p < b]
+    primes.extend(_wheel_sieve(a, b, _base_primes if base is None else base))
+    return reducer(primes)
+
+
+def _iter_range_segments(lo, hi, reducer, processes, segment_size):
+    """Generate reducer(primes) for the primes in each segment of [lo, hi),
+    in order.
+
+    """
+    lo = max(lo, 0)
+    if hi <= lo:
+        return
+    base = list(iter_primes(isqrt(hi - 1) + 1))
+    segment_size = max(segment_size, 30 * isqrt(hi))
+    segments = [(a, min(a + segment_size, hi))
+                for a in range(lo, hi, segment_size)]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    executor = None
+    if processes > 1 and len(segments) > 1:
+        try:
+            # Imported here since it is slow to import and rarely needed.
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(processes,
+                                           initializer=_set_base_primes,
+                                           initargs=(base,))
+        except (ImportError, NotImplementedError, OSError):
+            pass
+    if executor is None:
+        for a, b in segments:
+            yield _sieve_range_segment(a, b, reducer, base)
+        return
+    with executor:
+        # Keep a bounded number of segments in flight, so that results
+        # which are not consumed yet do not pile up.
+        segment_iter = iter(segments)
+        pending = deque(executor.submit(_sieve_range_segment, a, b, reducer)
+                        for a, b in islice(segment_iter, 2 * processes))
+        while pending:
+            result = pending.popleft().result()
+            for a, b in islice(segment_iter, 1):
+                pending.append(executor.submit(_sieve_range_segment, a, b,
+                                               reducer))
+            yield result
 
 
 class prime_iterator(object):
@@ -365,11 +1276,18 @@ class prime_iterator(object):
     def reset(self):
         self._i = 0
 
+    @profiling.timed('prime_iterator.augment')
     def _augment(self):
+        if profiling.enabled:
+            profiling.increment('prime_iterator.augments')
         p = self._p
         n = self._n
         a = self._a
-        m = int(log(n) / log(a) * a)
+        # Sieve at least 30 * sqrt(n) numbers at a time, so that every
+        # sieving prime hits each residue class of the wheel, but no further
+        # than the square of the largest prime, as more_primes() requires.
+        m = max(int(log(n) / log(a) * a), 30 * isqrt(n))
+        m = min(m, p[-1] * p[-1] - n)
         more_primes(p, n + m)
         self._len = len(p)
         self._n += m
@@ -421,6 +1339,105 @@ def is_prime(n, k=10):
     return True
 
 
+# Miller-Rabin with the first 13 primes as bases is deterministic for all
+# n below this limit.
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_MILLER_RABIN_LIMIT = 3317044064679887385961981
+
+# is_prime_many() sieves the whole range of the candidates instead if it is
+# at most this many times the number of candidates, below _DENSE_LIMIT and
+# at least the square root of its end, which bounds the cost of sieving the
+# base primes.
+_DENSE_RATIO = 32
+_DENSE_LIMIT = 1 << 48
+
+
+@lazy_table
+def _small_primes():
+    primes = frozenset(iter_primes(1000))
+    return primes, product(primes)
+
+
+def is_prime_many(numbers, processes=1):
+    """Return a bytearray whose i-th item is 1 if the i-th number in
+    numbers (any iterable of integers, e.g. a list or a NumPy array) is
+    prime, and 0 otherwise.
+
+    If the numbers are dense in a range that is longer than the square
+    root of its end, the range is sieved like iter_primes_range(). Otherwise
+    numbers with a prime factor below 1000 are rejected by one gcd with
+    the product of those primes, and the survivors are tested by
+    Miller-Rabin, deterministic below 3.3 * 10 ** 24 and falling back to
+    is_prime() above. The segments of the range or the survivors are split
+    among a process pool of the given size if processes > 1.
+
+    """
+    numbers = [int(n) for n in numbers]
+    result = bytearray(len(numbers))
+    if not numbers:
+        return result
+    lo = max(min(numbers), 0)
+    hi = max(numbers) + 1
+    if hi <= lo:
+        return result   # all negative
+    if (isqrt(hi) <= hi - lo <= _DENSE_RATIO * len(numbers) and
+            hi <= _DENSE_LIMIT):
+        flags = bytearray(hi - lo)
+        for p in iter_primes_range(lo, hi, processes):
+            flags[p - lo] = 1
+        for i, n in enumerate(numbers):
+            if n >= lo:
+                result[i] = flags[n - lo]
+        return result
+    small_primes, small_primes_product = _small_primes()
+    survivors = []
+    for i, n in enumerate(numbers):
+        if n < 1000:
+            result[i] = n in small_primes
+        elif gcd(n, small_primes_product) == 1:
+            survivors.append(i)
+    candidates = [numbers[i] for i in survivors]
+    if processes > 1 and len(candidates) > 1:
+        chunk_size = -(-len(candidates) // (processes * 4))
+        chunks = [candidates[k:k + chunk_size]
+                  for k in range(0, len(candidates), chunk_size)]
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(processes) as executor:
+            flags = b''.join(executor.map(_miller_rabin_many, chunks))
+    else:
+        flags = _miller_rabin_many(candidates)
+    for i, flag in zip(survivors, flags):
+        result[i] = flag
+    return result
+
+
+def _miller_rabin_many(numbers):
+    return bytes(_miller_rabin(n) for n in numbers)
+
+
+def _miller_rabin(n):
+    # n must be odd and greater than 41.
+    if n >= _MILLER_RABIN_LIMIT:
+        return is_prime(n)
+    d = n - 1
+    s = 0
+    while not d & 1:
+        s += 1
+        d >>= 1
+    m = n - 1
+    for a in _MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == m:
+            continue
+        for r in range(1, s):
+            x = x * x % n
+            if x == m:
+                break
+        else:
+            return False
+    return True
+
+
 def expmod(b, e, m):
     """Compute (b ** e) % m where b, e, and m must be positive integers."""
     r = 1
@@ -441,8 +1458,9 @@ def factorize(n):
     factorize(15750) --> [(2, 1), (3, 2), (5, 3), (7, 1)]
 
     """
-    it = _factorize_prime_iterator
+    it = _factorize_prime_iterator()
     factors = []
+    start = perf_counter() if profiling.enabled else None
     it.reset()
     for p in it:
         if n == 1 or n < p * p:
@@ -454,22 +1472,104 @@ def factorize(n):
                 n //= p
                 m += 1
             factors.append((p, m))
+    if start is not None:
+        profiling.record('factorize.trial_division', perf_counter() - start)
+        profiling.increment('factorize.calls')
+        profiling.increment('factorize.trial_divisions', it._i)
     if n > 1:
         factors.append((n, 1))
     return factors
-_factorize_prime_iterator = prime_iterator()
 
 
-def divisors(n):
-    """Return a list of the divisors of n in ascending order."""
+@lazy_table
+def _factorize_prime_iterator():
+    return prime_iterator()
+
+
+def divisors(n, factors=None):
+    """Return a list of the divisors of n in ascending order.
+
+    If factors, the result of factorize(n), is given, n is not factorized
+    again; this applies to all divisor functions below.
+
+    """
     d = [1]
-    for p, e in factorize(n):
-        l = len(d)
-        d.extend(x * p for i in range(e) for x in d[-l:])
+    for p, e in factorize(n) if factors is None else factors:
+        runs = [d]
+        for i in range(e):
+            runs.append([x * p for x in runs[-1]])
+        # The list is made of e + 1 sorted runs, which sort() merges in
+        # O(len * log(e + 1)) time.
+        d = list(chain.from_iterable(runs))
+        d.sort()
+    return d
+
+
+def iter_divisors(n, factors=None):
+    """Generate the divisors of n in ascending order.
+
+    The divisors are generated lazily by a heap merge, taking O(log(k))
+    time per divisor where k is the number of distinct prime factors, so
+    stopping early is cheap.
+
+    """
+    if factors is None:
+        factors = factorize(n)
+    m = len(factors)
+    # (d, i, k): p_i is the largest prime factor of d, with exponent k
+    queue = [(1, -1, 0)]
+    while queue:
+        d, i, k = heappop(queue)
+        yield d
+        if i >= 0 and k < factors[i][1]:
+            heappush(queue, (d * factors[i][0], i, k + 1))
+        for j in range(i + 1, m):
+            heappush(queue, (d * factors[j][0], j, 1))
+
+
+def divisors_up_to(n, limit, factors=None):
+    """Return a list of the divisors of n not greater than limit in
+    ascending order. Products exceeding limit are never extended.
+
+    divisors_up_to(60, 10) --> [1, 2, 3, 4, 5, 6, 10]
+
+    """
+    if limit < 1:
+        return []
+    d = [1]
+    for p, e in factorize(n) if factors is None else factors:
+        for i in range(len(d)):
+            x = d[i] * p
+            k = 0
+            while k < e and x <= limit:
+                d.append(x)
+                x *= p
+                k += 1
     d.sort()
     return d
 
 
+def divisors_in_range(n, lo, hi, factors=None):
+    """Return a list of the divisors d of n with lo <= d < hi in ascending
+    order.
+
+    Whichever of d and n // d has the smaller search bound is enumerated.
+
+    divisors_in_range(60, 5, 20) --> [5, 6, 10, 12, 15]
+
+    """
+    lo = max(lo, 1)
+    if hi <= lo:
+        return []
+    if n // lo < hi - 1:
+        # lo <= d < hi if and only if n // (hi - 1) <= n // d <= n // lo
+        d = [n // x for x in divisors_up_to(n, n // lo, factors)]
+        d.reverse()
+    else:
+        d = divisors_up_to(n, hi - 1, factors)
+    return [x for x in d if lo <= x < hi]
+
+
 def count_divisors(n):
     """Return the number of positive divisors of n."""
     # for n = (p ** a) * (q ** b) * ... * (r ** c),
@@ -0,0 +1,309 @@
+"""Polynomials and formal power series with integer coefficients.
+
+A polynomial a[0] + a[1] * x + a[2] * x ** 2 + ... is a list of its
+coefficients, lowest degree first. Most functions take an optional modulus
+and then return coefficients in range(mod); the power series functions
+need a prime modulus greater than the number of terms.
+
+    dice = [0, 1, 1, 1, 1, 1, 1]
+    power(dice, 10)[35]   # ways to roll a sum of 35 with ten dice
+
+Multiplication uses Kronecker substitution: each polynomial is packed into
+one big decimal number with a fixed number of digits per coefficient, and
+the numbers are multiplied by the C decimal module (libmpdec), which uses
+a number-theoretic transform for large operands. That is much faster than
+a number-theoretic transform written in Python, which ntt_multiply()
+implements for implementations of Python without the C decimal module.
+
+"""
+from .helpers import optional_import
+from .math2 import inverse_mod
+
+# NTT-friendly primes p = c * 2 ** k + 1 with the primitive root 3.
+NTT_PRIMES = (998244353, 167772161, 469762049)
+
+# Below this length, multiply() uses schoolbook multiplication.
+_SCHOOLBOOK_LIMIT = 32
+
+
+def multiply(a, b, mod=None):
+    """Return the product of the polynomials a and b, reduced modulo mod
+    if mod is given. Without mod, the coefficients must be non-negative.
+
+    multiply([1, 1], [1, 2, 1]) --> [1, 3, 3, 1]
+
+    """
+    if not a or not b:
+        return []
+    if mod is not None:
+        a = [x % mod for x in a]
+        b = [x % mod for x in b]
+    elif min(a) < 0 or min(b) < 0:
+        raise ValueError('coefficients must be non-negative without mod')
+    if min(len(a), len(b)) <= _SCHOOLBOOK_LIMIT:
+        return _schoolbook_multiply(a, b, mod)
+    decimal = optional_import('_decimal')
+    if decimal is not None:
+        c = _decimal_multiply(a, b, decimal)
+    elif (mod is not None and _ntt_bound(a, b, mod) < _ntt_modulus() and
+          _ntt_length(a, b) <= _max_ntt_length(NTT_PRIMES[0])):
+        return ntt_multiply(a, b, mod)
+    else:
+        c = _int_multiply(a, b)
+    return c if mod is None else [x % mod for x in c]
+
+
+def _schoolbook_multiply(a, b, mod):
+    if len(a) < len(b):
+        a, b = b, a
+    c = [0] * (len(a) + len(b) - 1)
+    for j, y in enumerate(b):
+        if y:
+            c[j:j + len(a)] = [z + x * y for z, x in zip(c[j:j + len(a)], a)]
+    return c if mod is None else [x % mod for x in c]
+
+
+def _coefficient_bound(a, b):
+    # An upper bound of the coefficients of the product.
+    return min(len(a), len(b)) * max(a) * max(b)
+
+
+def _decimal_multiply(a, b, decimal):
+    width = len(str(_coefficient_bound(a, b)))
+    fmt = '%0{0}d'.format(width).__mod__
+    context = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX,
+                              Emin=decimal.MIN_EMIN)
+    x = decimal.Decimal(''.join(map(fmt, reversed(a))))
+    y = decimal.Decimal(''.join(map(fmt, reversed(b))))
+    size = len(a) + len(b) - 1
+    digits = str(context.multiply(x, y)).rjust(size * width, '0')
+    end = len(digits)
+    return [int(digits[i - width:i]) for i in range(end, 0, -width)]
+
+
+def _int_multiply(a, b):
+    width = max(1, (_coefficient_bound(a, b).bit_length() + 7) // 8)
+    x = int.from_bytes(b''.join(v.to_bytes(width, 'little') for v in a),
+                       'little')
+    y = int.from_bytes(b''.join(v.to_bytes(width, 'little') for v in b),
+                       'little')
+    size = len(a) + len(b) - 1
+    data = (x * y).to_bytes(size * width, 'little')
+    return [int.from_bytes(data[i:i + width], 'little')
+            for i in range(0, size * width, width)]
+
+
+def _ntt_modulus():
+    m = 1
+    for p in NTT_PRIMES:
+        m *= p
+    return m
+
+
+def _ntt_bound(a, b, mod):
+    return min(len(a), len(b)) * (mod - 1) ** 2
+
+
+def _ntt_length(a, b):
+    return 1 << (len(a) + len(b) - 2).bit_length()
+
+
+def _max_ntt_length(p):
+    # The largest power of two dividing p - 1. Longer transforms need
+    # roots of unity of orders that do not exist modulo p.
+    return (p - 1) & (1 - p)
+
+
+def _roots(p, h, inverse):
+    # w ** k for 0 <= k < h, where w is a primitive (2 * h)-th root of
+    # unity modulo p.
+    w = pow(3, (p - 1) // (2 * h), p)
+    if inverse:
+        w = pow(w, p - 2, p)
+    roots = [1] * h
+    for k in range(1, h):
+        roots[k] = roots[k - 1] * w % p
+    return roots
+
+
+def _ntt(a, p):
+    # Decimation in frequency: natural order in, bit-reversed order out.
+    n = len(a)
+    h = n >> 1
+    while h:
+        roots = _roots(p, h, False)
+        for s in range(0, n, 2 * h):
+            x = a[s:s + h]
+            y = a[s + h:s + 2 * h]
+            a[s:s + h] = [(u + v) % p for u, v in zip(x, y)]
+            a[s + h:s + 2 * h] = [(u - v) * w % p
+                                  for u, v, w in zip(x, y, roots)]
+        h >>= 1
+
+
+def _inverse_ntt(a, p):
+    # Decimation in time: bit-reversed order in, natural order out.
+    n = len(a)
+    h = 1
+    while h < n:
+        roots = _roots(p, h, True)
+        for s in range(0, n, 2 * h):
+            x = a[s:s + h]
+            y = [v * w % p for v, w in zip(a[s + h:s + 2 * h], roots)]
+            a[s:s + h] = [(u + v) % p for u, v in zip(x, y)]
+            a[s + h:s + 2 * h] = [(u - v) % p for u, v in zip(x, y)]
+        h <<= 1
+    n_inverse = pow(n, p - 2, p)
+    a[:] = [x * n_inverse % p for x in a]
+
+
+def _ntt_convolve(a, b, p):
+    size = len(a) + len(b) - 1
+    n = _ntt_length(a, b)
+    if n > _max_ntt_length(p):
+        raise ValueError('transform length {0} too large for {1}'.format(
+            n, p))
+    x = [v % p for v in a] + [0] * (n - len(a))
+    y = [v % p for v in b] + [0] * (n - len(b))
+    _ntt(x, p)
+    _ntt(y, p)
+    z = [u * v % p for u, v in zip(x, y)]
+    _inverse_ntt(z, p)
+    return z[:size]
+
+
+def ntt_multiply(a, b, mod):
+    """Return the product of the polynomials a and b modulo mod with
+    number-theoretic transforms written in Python.
+
+    If mod is one of NTT_PRIMES, one transform is enough. Otherwise the
+    product is computed modulo all of NTT_PRIMES and combined with the
+    Chinese remainder theorem, which is exact as long as
+    min(len(a), len(b)) * (mod - 1) ** 2 < product(NTT_PRIMES) (about
+    2 ** 86).
+
+    Raise ValueError if len(a) + len(b) - 1 exceeds the longest transform
+    the primes support, which is 2 ** 23 for 998244353.
+
+    """
+    if not a or not b:
+        return []
+    if mod in NTT_PRIMES:
+        return _ntt_convolve(a, b, mod)
+    if _ntt_bound(a, b, mod) >= _ntt_modulus():
+        raise ValueError('modulus too large for three primes: {0}'.format(
+            mod))
+    p1, p2, p3 = NTT_PRIMES
+    r1 = _ntt_convolve(a, b, p1)
+    r2 = _ntt_convolve(a, b, p2)
+    r3 = _ntt_convolve(a, b, p3)
+    # Garner's algorithm
+    c2 = inverse_mod(p1, p2)
+    c3 = inverse_mod(p1 * p2 % p3, p3)
+    p12 = p1 * p2
+    ret = []
+    for x1, x2, x3 in zip(r1, r2, r3):
+        x = x1 + p1 * ((x2 - x1) * c2 % p2)
+        x += p12 * ((x3 - x) * c3 % p3)
+        ret.append(x % mod)
+    return ret
+
+
+def power(a, k, mod=None, n=None):
+    """Return the polynomial a ** k, reduced modulo mod if mod is given and
+    truncated to its first n coefficients if n is given.
+
+    power([1, 1], 3) --> [1, 3, 3, 1]
+
+    """
+    result = [1]
+    base = a[:n]
+    while k:
+        if k & 1:
+            result = multiply(result, base, mod)[:n]
+        k >>= 1
+        if k:
+            base = multiply(base, base, mod)[:n]
+    result = result[:n]
+    return result if mod is None else [x % mod for x in result]
+
+
+def _inverses(n, mod):
+    # [0, 1 / 1, 1 / 2, ..., 1 / (n - 1)] modulo the prime mod > n - 1.
+    inv = [0, 1] + [0] * (n - 2) if n > 1 else [0] * n
+    for i in range(2, n):
+        inv[i] = -(mod // i) * inv[mod % i] % mod
+    return inv
+
+
+def _check_series_modulus(n, mod):
+    # _inverses(n, mod) needs 1, 2, ..., n - 1 to be invertible.
+    if mod <= n - 1:
+        raise ValueError('modulus too small for {0} terms: {1}'.format(
+            n, mod))
+
+
+def _truncate(a, n):
+    return a[:n] + [0] * (n - len(a))
+
+
+def series_inverse(a, n, mod):
+    """Return the first n coefficients of the power series 1 / a modulo
+    mod. a[0] must be invertible modulo mod.
+
+    series_inverse([1, -1], 5, 7) --> [1, 1, 1, 1, 1]
+
+    """
+    b = [inverse_mod(a[0] % mod, mod)]
+    if b[0] is None:
+        raise ValueError('a[0] is not invertible modulo {0}'.format(mod))
+    k = 1
+    # Newton's iteration b <- b * (2 - a * b) doubles the number of
+    # correct coefficients.
+    while k < n:
+        k = min(2 * k, n)
+        c = [-x % mod for x in multiply(a[:k], b, mod)[:k]]
+        c[0] = (c[0] + 2) % mod
+        b = multiply(b, c, mod)[:k]
+    return _truncate(b, n)
+
+
+def series_log(a, n, mod):
+    """Return the first n coefficients of the power series log(a) modulo
+    the prime mod > n. a[0] must be 1.
+
+    series_log([1, 1], 4, 998244353) --> [0, 1, 499122176, 332748118]
+
+    """
+    _check_series_modulus(n, mod)
+    if a[0] % mod != 1:
+        raise ValueError('a[0] must be 1')
+    if n <= 1:
+        return [0] * n
+    derivative = [i * x % mod for i, x in enumerate(a[1:n], 1)]
+    q = multiply(derivative, series_inverse(a, n - 1, mod), mod)
+    inv = _inverses(n, mod)
+    return [0] + [x * y % mod for x, y in zip(_truncate(q, n - 1), inv[1:])]
+
+
+def series_exp(a, n, mod):
+    """Return the first n coefficients of the power series exp(a) modulo
+    the prime mod > n. a[0] must be 0.
+
+    series_exp([0, 1], 4, 998244353) --> [1, 1, 499122177, 166374059]
+
+    """
+    _check_series_modulus(n, mod)
+    if a and a[0] % mod:
+        raise ValueError('a[0] must be 0')
+    b = [1]
+    k = 1
+    # Newton's iteration b <- b * (1 + a - log(b)).
+    while k < n:
+        k = min(2 * k, n)
+        c = [(x - y) % mod
+             for x, y in zip(_truncate(a, k), series_log(b, k, mod))]
+        c[0] = (c[0] + 1) % mod
+        b = multiply(b, c, mod)[:k]
+    return _truncate(b, n)
+
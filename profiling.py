@@ -0,0 +1,137 @@
+"""Opt-in counters and timings for the hot paths of eulerlib.
+
+Instrumentation is disabled by default, in which case each instrumented
+function only pays for one attribute lookup. Enable it with instrumented():
+
+    with instrumented() as registry:
+        factorize(600851475143)
+    registry.as_dict()
+    print(registry.to_prometheus())
+
+Counters and timings recorded by eulerlib:
+
+    sieve.segments               segments sieved by any prime sieve
+    sieve                        time spent sieving segments
+    prime_iterator.augments      prime_iterator._augment() calls
+    prime_iterator.augment       time spent in prime_iterator._augment()
+    factorize.calls              factorize() calls
+    factorize.trial_divisions    primes tried by trial division
+    factorize.trial_division     time spent in trial division
+    heap.sift_steps              levels moved by BinaryHeap sift operations
+    heap.decrease_keys           decrease_key() calls on any heap
+    heap.links                   trees linked by FibonacciHeap consolidation
+
+"""
+import functools
+from contextlib import contextmanager
+from time import perf_counter
+
+enabled = False
+
+
+class Registry(object):
+    """Collection of named counters and timings."""
+
+    def __init__(self):
+        self.counters = {}
+        self.timings = {}
+
+    def increment(self, name, n=1):
+        counters = self.counters
+        counters[name] = counters.get(name, 0) + n
+
+    def record(self, name, seconds):
+        """Record one timed event of the given duration."""
+        timings = self.timings
+        if name in timings:
+            t = timings[name]
+            t[0] += 1
+            t[1] += seconds
+        else:
+            timings[name] = [1, seconds]
+
+    def reset(self):
+        self.counters.clear()
+        self.timings.clear()
+
+    def as_dict(self):
+        """Return the current values as a dict of the form
+        {'counters': {name: n}, 'timings': {name: {'count': n,
+        'seconds': s}}}.
+
+        """
+        return {
+            'counters': dict(self.counters),
+            'timings': dict((name, {'count': n, 'seconds': s})
+                            for name, (n, s) in self.timings.items()),
+        }
+
+    def to_prometheus(self, prefix='eulerlib'):
+        """Return the current values in the Prometheus text exposition
+        format. Counters become <prefix>_<name>_total and timings become
+        summaries <prefix>_<name>_seconds.
+
+        """
+        lines = []
+        for name, n in sorted(self.counters.items()):
+            metric = _metric_name(prefix, name) + '_total'
+            lines.append('# TYPE {0} counter'.format(metric))
+            lines.append('{0} {1}'.format(metric, n))
+        for name, (n, s) in sorted(self.timings.items()):
+            metric = _metric_name(prefix, name) + '_seconds'
+            lines.append('# TYPE {0} summary'.format(metric))
+            lines.append('{0}_count {1}'.format(metric, n))
+            lines.append('{0}_sum {1!r}'.format(metric, s))
+        lines.append('')
+        return '\n'.join(lines)
+
+
+def _metric_name(prefix, name):
+    return '{0}_{1}'.format(prefix, name).replace('.', '_')
+
+
+registry = Registry()
+
+
+def increment(name, n=1):
+    registry.increment(name, n)
+
+
+def record(name, seconds):
+    registry.record(name, seconds)
+
+
+def timed(name):
+    """Decorator recording the time spent in each call of the function
+    under the given name while instrumentation is enabled.
+
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return f(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                registry.record(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def instrumented(reset=True):
+    """Enable instrumentation within the block and yield the registry.
+    The registry is cleared on entry unless reset is False.
+
+    """
+    global enabled
+    if reset:
+        registry.reset()
+    previous = enabled
+    enabled = True
+    try:
+        yield registry
+    finally:
+        enabled = previous
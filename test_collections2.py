@@ -0,0 +1,291 @@
+import random
+
+import pytest
+from eulerlib.collections2 import (AdjacencyListDigraph, AdjacencyListGraph,
+                                   BinaryHeap, DisjointSet, FibonacciHeap,
+                                   batch_binary_search, binary_search,
+                                   binary_search_left, binary_search_right,
+                                   iter_galloping_search, reconstruct_path)
+
+
+def make_digraph(edges):
+    g = AdjacencyListDigraph()
+    for e in edges:
+        if len(e) == 3:
+            g.add(e[:2], e[2])
+        else:
+            g.add(e)
+    return g
+
+
+def test_topological_sort():
+    g = make_digraph([(1, 2), (1, 3), (3, 2), (2, 4), (5, 4)])
+    order = g.topological_sort()
+    assert sorted(order) == [1, 2, 3, 4, 5]
+    for u, v in g.edges:
+        assert order.index(u) < order.index(v)
+
+
+def test_topological_sort_deep():
+    n = 100000
+    g = make_digraph((i, i + 1) for i in range(n))
+    assert g.topological_sort() == list(range(n + 1))
+
+
+def test_topological_sort_cycle():
+    g = make_digraph([(0, 1), (1, 2), (2, 3), (3, 1)])
+    with pytest.raises(ValueError):
+        g.topological_sort()
+    it = g.iter_topological_sort()
+    assert next(it) == 0
+    with pytest.raises(ValueError):
+        next(it)
+
+
+def test_strongly_connected_components():
+    g = make_digraph([(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 3),
+                      (5, 4)])
+    components = g.strongly_connected_components()
+    assert sorted(map(sorted, components)) == [[0, 1, 2], [3, 4], [5]]
+    position = dict((u, i) for i, c in enumerate(components) for u in c)
+    for u, v in g.edges:
+        assert position[u] <= position[v]
+
+
+def test_strongly_connected_components_deep():
+    n = 100000
+    g = make_digraph([(i, i + 1) for i in range(n)] + [(n, 0)])
+    assert len(g.strongly_connected_components()) == 1
+
+
+def test_condensation():
+    g = make_digraph([(0, 1, 5), (1, 0, 1), (0, 2, 3), (1, 2, 2),
+                      (2, 3, 1), (3, 2, 1)])
+    components, dag = g.condensation()
+    assert list(map(sorted, components)) == [[0, 1], [2, 3]]
+    assert list(dag.edges) == [(0, 1)]
+    assert dag.weight((0, 1)) == 2
+
+
+def test_reachability():
+    rng = random.Random(0)
+    for _ in range(20):
+        g = make_digraph((rng.randrange(20), rng.randrange(20))
+                         for _ in range(25))
+        r = g.reachability()
+        for u in g.nodes:
+            reachable = {u}
+            stack = [u]
+            while stack:
+                for v in g.next_nodes(stack.pop()):
+                    if v not in reachable:
+                        reachable.add(v)
+                        stack.append(v)
+            assert sorted(r.reachable_nodes(u)) == sorted(reachable)
+            for v in g.nodes:
+                assert r.is_reachable(u, v) == (v in reachable)
+
+
+def test_dag_paths():
+    g = make_digraph([('a', 'b', 3), ('a', 'c', 1), ('c', 'b', 1),
+                      ('b', 'd', 2), ('c', 'd', 5), ('e', 'a', 1)])
+    dist, prev = g.dag_shortest_paths('a')
+    assert dist == {'a': 0, 'b': 2, 'c': 1, 'd': 4}
+    assert prev == {'a': None, 'b': 'c', 'c': 'a', 'd': 'b'}
+    dist, prev = g.dag_longest_paths('a')
+    assert dist == {'a': 0, 'b': 3, 'c': 1, 'd': 6}
+    assert prev['d'] == 'c'
+
+
+def make_grid(n):
+    g = AdjacencyListDigraph()
+    for x in range(n):
+        for y in range(n):
+            w = (x * 7 + y * 13) % 5 + 1
+            if x + 1 < n:
+                g.add(((x, y), (x + 1, y)), w)
+                g.add(((x + 1, y), (x, y)), w + 1)
+            if y + 1 < n:
+                g.add(((x, y), (x, y + 1)), w + 2)
+                g.add(((x, y + 1), (x, y)), w)
+    return g
+
+
+@pytest.mark.parametrize('queue_type', [BinaryHeap, FibonacciHeap])
+def test_shortest_path(queue_type):
+    g = make_grid(12)
+    source = (0, 0)
+    dist, prev = g.dijkstra(queue_type(), source)
+    for target in [(0, 0), (11, 11), (5, 3), (0, 11)]:
+        expected = dist[target], reconstruct_path(prev, target)
+        d, path = g.shortest_path(queue_type(), source, target)
+        assert d == expected[0]
+        assert path[0] == source and path[-1] == target
+        assert sum(g.weight(e) for e in zip(path, path[1:])) == d
+        d, path = g.bidirectional_dijkstra(queue_type(), queue_type(),
+                                           source, target)
+        assert d == expected[0]
+        assert path[0] == source and path[-1] == target
+        assert sum(g.weight(e) for e in zip(path, path[1:])) == d
+        h = lambda u: abs(u[0] - target[0]) + abs(u[1] - target[1])
+        d, path = g.astar(queue_type(), source, target, h)
+        assert d == expected[0]
+        assert sum(g.weight(e) for e in zip(path, path[1:])) == d
+
+
+def test_shortest_path_unreachable():
+    g = make_digraph([(1, 2), (3, 4)])
+    assert g.shortest_path(BinaryHeap(), 1, 4) is None
+    assert g.bidirectional_dijkstra(BinaryHeap(), BinaryHeap(), 1, 4) is None
+    assert g.shortest_path(BinaryHeap(), 1, 2) == (1, [1, 2])
+
+
+@pytest.mark.parametrize('queue_type', [BinaryHeap, FibonacciHeap])
+@pytest.mark.parametrize('sizes', [(0, 50), (50, 3), (10, 40)])
+def test_heap_add_many(queue_type, sizes):
+    rng = random.Random(0)
+    first, second = ([rng.randrange(100) for _ in range(n)] for n in sizes)
+    q = queue_type.from_iterable(first)
+    q.add_many(second)
+    expected = sorted(set(first + second))
+    assert len(q) == len(expected)
+    assert all(x in q for x in expected)
+    q.decrease_key(expected[-1], -1)
+    expected = [-1] + expected[:-1]
+    assert q.pop_many(3) == expected[:3]
+    with pytest.raises(KeyError):
+        q.pop_many(len(q) + 1)
+    assert q.pop_many(len(q)) == expected[3:]
+    assert not q
+
+
+def test_binary_heap_pop_many():
+    items = list(range(100))
+    random.Random(0).shuffle(items)
+    q = BinaryHeap.from_iterable(items)
+    assert q.pop_many(5) == [0, 1, 2, 3, 4]
+    assert q.pop_many(60) == list(range(5, 65))
+    q.add(0)
+    q.decrease_key(99, -1)
+    assert [q.pop() for _ in range(len(q))] == [-1, 0] + list(range(65, 99))
+
+
+def test_fibonacci_heap_meld():
+    q1 = FibonacciHeap.from_iterable([5, 3, 8])
+    q1.pop()
+    q2 = FibonacciHeap.from_iterable([7, 1, 4, 9])
+    q1.meld(q2)
+    assert not q2 and 1 not in q2
+    assert len(q1) == 6 and 1 in q1
+    q1.meld(FibonacciHeap())
+    q1.decrease_key(9, 2)
+    assert q1.pop_many(6) == [1, 2, 4, 5, 7, 8]
+    q3 = FibonacciHeap()
+    q3.meld(FibonacciHeap.from_iterable([2, 1]))
+    assert q3.peek() == 1
+    with pytest.raises(KeyError):
+        q3.meld(FibonacciHeap.from_iterable([2]))
+    with pytest.raises(ValueError):
+        q3.meld(q3)
+
+
+def test_dijkstra_multiple_sources():
+    g = make_grid(12)
+    sources = [(0, 0), (11, 11), (0, 11)]
+    dist, _ = g.dijkstra(BinaryHeap(), *sources)
+    single = [g.dijkstra(BinaryHeap(), s)[0] for s in sources]
+    assert dist == dict((u, min(d[u] for d in single)) for u in dist)
+
+
+def test_disjoint_set():
+    s = DisjointSet(range(10))
+    assert len(s) == 10
+    assert s.union(1, 2)
+    assert s.union(3, 4)
+    assert s.union(2, 4)
+    assert not s.union(1, 3)
+    assert s.find(1) == s.find(4)
+    assert s.find(1) != s.find(5)
+    s.add('a')
+    assert 'a' in s
+    assert s.find('a') == 'a'
+
+
+def test_graph_weight_canonical_key():
+    g = AdjacencyListGraph()
+    g.add((1000, 'x'), 3)
+    g.add(('x', 1000), 4)
+    assert len(g.edges) == 1
+    assert g.weight((1000, 'x')) == 4
+    assert g.weight(('x', 1000)) == 4
+
+
+@pytest.mark.parametrize('method', ['kruskal', 'lazy_prim', 'prim',
+                                    'fibonacci_prim'])
+def test_minimum_spanning_tree(method):
+    g = AdjacencyListGraph()
+    edges = [('a', 'b', 7), ('a', 'd', 5), ('b', 'c', 8), ('b', 'd', 9),
+             ('b', 'e', 7), ('c', 'e', 5), ('d', 'e', 15), ('d', 'f', 6),
+             ('e', 'f', 8), ('e', 'g', 9), ('f', 'g', 11)]
+    for u, v, w in edges:
+        g.add((u, v), w)
+    if method == 'prim':
+        tree = list(g.minimum_spanning_tree(BinaryHeap()))
+    elif method == 'fibonacci_prim':
+        tree = list(g.minimum_spanning_tree(FibonacciHeap()))
+    else:
+        tree = getattr(g, method)()
+    assert len(tree) == 6
+    assert sum(g.weight(e) for e in tree) == 39
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_iter_shortest_path_lengths(processes):
+    g = make_grid(6)
+    sources = [(0, 0), (3, 2), (5, 5)]
+    results = dict(g.iter_shortest_path_lengths(sources, processes))
+    assert sorted(results) == sorted(sources)
+    for s in sources:
+        assert results[s] == g.dijkstra(BinaryHeap(), s)[0]
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_iter_shortest_path_lengths_big_weights(processes):
+    g = make_digraph([(1, 2, 2 ** 70), (2, 3, 1), (1, 3, 2 ** 71)])
+    results = dict(g.iter_shortest_path_lengths([1, 2], processes))
+    assert results[1] == {1: 0, 2: 2 ** 70, 3: 2 ** 70 + 1}
+    assert results[2] == {2: 0, 3: 1}
+
+
+def test_floyd_warshall():
+    g = make_grid(4)
+    g.add(((9, 9), (0, 0)), 1)
+    nodes, dist = g.floyd_warshall()
+    for i, u in enumerate(nodes):
+        expected = g.dijkstra(BinaryHeap(), u)[0]
+        for j, v in enumerate(nodes):
+            assert dist[i][j] == expected.get(v, float('inf'))
+
+
+def test_binary_search():
+    a = [1, 3, 3, 5, 8]
+    assert binary_search(a, 5) == 3
+    assert binary_search(a, 4) == 3
+    assert binary_search(a, 9) == 5
+    assert binary_search_left(a, 3) == 1
+    assert binary_search_right(a, 3) == 3
+    assert binary_search_left(a, 0) == 0
+    assert binary_search_left(a, 9) == 5
+    assert binary_search_left(a, 3, 2) == 2
+    assert binary_search_right(a, 8, 0, 3) == 3
+
+
+def test_galloping_and_batch_search():
+    random.seed(0)
+    a = sorted(random.randrange(1000) for _ in range(500))
+    values = [random.randrange(-10, 1010) for _ in range(300)]
+    expected = [binary_search_left(a, v) for v in values]
+    assert batch_binary_search(a, values) == expected
+    assert (list(iter_galloping_search(a, sorted(values))) ==
+            sorted(expected))
+    assert batch_binary_search([], [1, 2]) == [0, 0]
@@ -0,0 +1,87 @@
+import itertools
+
+import pytest
+from eulerlib.digitdp import (DigitDP, DigitSum, DigitSumModulo,
+                              NondecreasingDigits, NonincreasingDigits,
+                              PandigitalDigits, ProductAutomaton,
+                              count_palindromes)
+from eulerlib.math2 import (digits, is_palindromic, is_pandigital,
+                            iter_nondecreasing_digits,
+                            iter_nonincreasing_digits)
+
+
+def brute_force(automaton, n, base=10):
+    accepted = []
+    for x in range(1, n + 1):
+        s = automaton.start()
+        for d in digits(x, base):
+            s = automaton.step(s, d)
+            if s is None:
+                break
+        else:
+            if automaton.accept(s):
+                accepted.append(x)
+    return accepted
+
+
+@pytest.mark.parametrize('automaton', [
+    NondecreasingDigits(), NonincreasingDigits(), DigitSum(10),
+    DigitSumModulo(7, 3),
+    ProductAutomaton(NondecreasingDigits(), DigitSumModulo(3)),
+])
+def test_digit_dp(automaton):
+    dp = DigitDP(automaton)
+    accepted = brute_force(automaton, 3000)
+    for n in itertools.chain(range(0, 130), [999, 1000, 2345, 3000]):
+        expected = [x for x in accepted if x <= n]
+        assert dp.count(n) == len(expected)
+        assert dp.sum(n) == sum(expected)
+    for k, x in enumerate(accepted[:200], 1):
+        assert dp.nth(k) == x
+        assert dp.rank(x) == k
+
+
+def test_digit_dp_base():
+    automaton = DigitSum(3)
+    dp = DigitDP(automaton, 2)
+    accepted = brute_force(automaton, 500, 2)
+    assert dp.count(500) == len(accepted)
+    assert dp.sum(500) == sum(accepted)
+
+
+def test_monotone_digits():
+    dp = DigitDP(NondecreasingDigits())
+    it = iter_nondecreasing_digits()
+    for k in range(1, 2000):
+        assert dp.nth(k) == next(it)
+    dp = DigitDP(NonincreasingDigits())
+    it = iter_nonincreasing_digits()
+    for k in range(1, 2000):
+        assert dp.nth(k) == next(it)
+    # C(100 + 9, 9) - 1 numbers below 10 ** 100 have nondecreasing digits
+    assert DigitDP(NondecreasingDigits()).count(10 ** 100 - 1) == \
+        4263421511271 - 1
+
+
+def test_pandigital():
+    for n in range(1, 6):
+        dp = DigitDP(PandigitalDigits(n))
+        expected = [x for x in range(1, 10 ** n)
+                    if is_pandigital(digits(x), n)]
+        assert dp.count(10 ** n) == len(expected)
+        assert dp.sum(10 ** n) == sum(expected)
+    assert DigitDP(PandigitalDigits(9)).count(10 ** 9) == 362880
+
+
+def test_count_palindromes():
+    count = 0
+    for n in range(1, 20000):
+        if is_palindromic(digits(n)):
+            count += 1
+        assert count_palindromes(n) == count
+    assert count_palindromes(0) == 0
+    count = 0
+    for n in range(1, 1000):
+        if is_palindromic(digits(n, 3)):
+            count += 1
+        assert count_palindromes(n, 3) == count
@@ -0,0 +1,55 @@
+from math import gcd, isqrt
+
+import pytest
+from eulerlib.diophantine import (count_pythagorean_triples,
+                                  iter_primitive_pythagorean_triples,
+                                  iter_pythagorean_triples,
+                                  perimeter_histogram)
+
+
+def brute_force_triples(max_perimeter=None, max_hypotenuse=None):
+    limit = max_hypotenuse or max_perimeter
+    triples = []
+    for c in range(1, limit + 1):
+        for a in range(1, c):
+            b = isqrt(c * c - a * a)
+            if (a < b and a * a + b * b == c * c and
+                    (max_perimeter is None or a + b + c <= max_perimeter) and
+                    (max_hypotenuse is None or c <= max_hypotenuse)):
+                triples.append((a, b, c))
+    return sorted(triples)
+
+
+@pytest.mark.parametrize('max_perimeter,max_hypotenuse', [
+    (12, None), (11, None), (1000, None), (None, 4), (None, 300), (500, 150),
+])
+def test_pythagorean_triples(max_perimeter, max_hypotenuse):
+    triples = brute_force_triples(max_perimeter, max_hypotenuse)
+    primitive = [t for t in triples if gcd(*t) == 1]
+    assert sorted(iter_pythagorean_triples(
+        max_perimeter, max_hypotenuse)) == triples
+    assert sorted(iter_primitive_pythagorean_triples(
+        max_perimeter, max_hypotenuse)) == primitive
+    assert count_pythagorean_triples(
+        max_perimeter, max_hypotenuse) == len(triples)
+    assert count_pythagorean_triples(
+        max_perimeter, max_hypotenuse, primitive=True) == len(primitive)
+
+
+def test_pythagorean_triples_need_bound():
+    with pytest.raises(ValueError):
+        next(iter_primitive_pythagorean_triples())
+    with pytest.raises(ValueError):
+        count_pythagorean_triples()
+
+
+def test_perimeter_histogram():
+    triples = brute_force_triples(1000)
+    hist = perimeter_histogram(1000)
+    primitive_hist = perimeter_histogram(1000, primitive=True)
+    assert len(hist) == 1001
+    for p in range(1001):
+        assert hist[p] == sum(1 for t in triples if sum(t) == p)
+        assert primitive_hist[p] == sum(1 for t in triples
+                                        if sum(t) == p and gcd(*t) == 1)
+    assert sum(1 for x in perimeter_histogram(1500000) if x == 1) == 161667
@@ -0,0 +1,97 @@
+from itertools import accumulate
+
+import pytest
+from eulerlib import dirichlet
+from eulerlib.dirichlet import (QuotientTable, count_fractions,
+                                divisor_count_sum, divisor_sum_sum,
+                                iter_quotient_blocks, mertens, mertens_table,
+                                min25_sum, mobius_values,
+                                power_sum, prime_count, prime_power_sums,
+                                prime_sum, totient_sum, totients)
+from eulerlib.math2 import (count_divisors, iter_farey, iter_primes,
+                            sum_divisors)
+
+
+def test_iter_quotient_blocks():
+    assert list(iter_quotient_blocks(10)) == [
+        (10, 1, 1), (5, 2, 2), (3, 3, 3), (2, 4, 5), (1, 6, 10)]
+    for n in range(1, 100):
+        t = QuotientTable(n)
+        assert t.keys() == sorted(set(n // k for k in range(1, n + 1)))
+
+
+def test_power_sum():
+    for k in range(6):
+        for n in range(20):
+            assert power_sum(n, k) == sum(m ** k for m in range(1, n + 1))
+
+
+def test_tables():
+    assert totients(11) == [0, 1, 1, 2, 2, 4, 2, 6, 4, 6, 4]
+    assert mobius_values(11) == [0, 1, -1, -1, 0, -1, 1, -1, 0, 0, 1]
+
+
+@pytest.mark.parametrize('n', [1, 2, 10, 100, 1000, 12345])
+def test_prefix_sums(n):
+    phi = totients(n + 1)
+    mu = mobius_values(n + 1)
+    primes = list(iter_primes(n + 1))
+    assert totient_sum(n) == sum(phi)
+    assert mertens(n) == sum(mu)
+    assert prime_count(n) == len(primes)
+    assert prime_sum(n) == sum(primes)
+    assert divisor_count_sum(n) == sum(count_divisors(k)
+                                       for k in range(1, n + 1))
+    assert divisor_sum_sum(n) == sum(sum_divisors(k)
+                                     for k in range(1, n + 1))
+
+
+def test_small_sums_cached():
+    tables = dirichlet._small_sum_tables()
+    tables.clear()
+    assert mertens(10 ** 6) == 212
+    sums = tables[mobius_values]
+    assert mertens(10 ** 3) == 2
+    assert tables[mobius_values] is sums
+    assert totient_sum(10 ** 3) == 304192
+    sums = tables[totients]
+    assert list(sums) == list(accumulate(totients(len(sums))))
+
+
+def test_known_values():
+    assert prime_count(10 ** 9) == 50847534
+    assert mertens(10 ** 9) == -222
+    assert totient_sum(10 ** 6) == 303963552392
+
+
+def test_min25_sum():
+    n = 5000
+    counts = prime_power_sums(n)
+    # sigma_0(p ** e) = e + 1
+    t = QuotientTable(n, [2 * x for x in counts.small],
+                      [2 * x for x in counts.large])
+    assert min25_sum(n, t, lambda p, e: e + 1) == divisor_count_sum(n)
+    # phi(p ** e) = p ** e - p ** (e - 1)
+    sums = prime_power_sums(n, 1)
+    t = QuotientTable(n, [s - c for s, c in zip(sums.small, counts.small)],
+                      [s - c for s, c in zip(sums.large, counts.large)])
+    assert min25_sum(n, t, lambda p, e: p ** e - p ** (e - 1)) == \
+        totient_sum(n)
+
+
+def test_mertens_table():
+    n = 1000
+    mu = mobius_values(n + 1)
+    t = mertens_table(n)
+    for v in t.keys():
+        assert t[v] == sum(mu[1:v + 1])
+
+
+@pytest.mark.parametrize('lo,hi', [
+    ((0, 1), (1, 1)), ((1, 3), (1, 2)), ((2, 4), (7, 5)), ((3, 2), (1, 1)),
+])
+def test_count_fractions(lo, hi):
+    for n in [0, 1, 7, 100]:
+        assert count_fractions(n, lo, hi) == sum(
+            1 for _ in iter_farey(n, lo, hi))
+    assert count_fractions(10 ** 5) == totient_sum(10 ** 5) + 1
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from eulerlib import helpers
+from eulerlib.helpers import lazy_table, memoize
+
+
+def test_memoize():
+    calls = []
+
+    @memoize
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert calls == [3]
+
+
+def test_lazy_table():
+    calls = []
+
+    @lazy_table
+    def table():
+        calls.append(1)
+        return [1, 2, 3]
+
+    assert table.key not in helpers.tables
+    assert table() is table()
+    assert helpers.tables[table.key] == [1, 2, 3]
+    assert calls == [1]
+    del helpers.tables[table.key]
+
+
+def test_import_builds_no_tables():
+    code = '\n'.join([
+        'import sys',
+        'import eulerlib',
+        'for name in eulerlib.__all__:',
+        '    getattr(eulerlib, name)',
+        'from eulerlib import helpers',
+        'assert not helpers.tables, helpers.tables',
+        'assert "concurrent.futures" not in sys.modules',
+        'assert "numpy" not in sys.modules',
+        'assert "fractions" not in sys.modules',
+    ])
+    env = {'PYTHONPATH': os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, '-S', '-c', code], check=True, env=env)
@@ -1,9 +1,23 @@
+import fractions
 import itertools
+import math
 
 import pytest
-from eulerlib.math2 import (binomial_coefficient, count_divisors, expmod,
-                            factorize, iter_primes, is_prime, more_primes,
-                            prime_iterator)
+from eulerlib import profiling
+from eulerlib.math2 import (best_rational_approximation, binomial_coefficient,
+                            count_divisors, count_primes_range,
+                            count_twin_primes_range, crt, digital_root, digits,
+                            digits_to_number, discrete_log, divisors,
+                            divisors_in_range, divisors_up_to, expmod,
+                            factorial, factorize, farey_neighbors, floor_sum,
+                            is_prime, is_prime_many, iter_divisors, iter_farey,
+                            iter_primes, iter_primes_range,
+                            iter_primes_unbounded, more_primes,
+                            multinomial_coefficient, multiplicative_order,
+                            partition_count, partition_table, prime_iterator,
+                            primitive_root, product,
+                            restricted_partition_table, sqrt_mod,
+                            sum_primes_range)
 
 primes = [
     2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61,
@@ -20,6 +34,30 @@ primes = [
 ]
 
 
+def test_digits():
+    assert digits(1437) == [1, 4, 3, 7]
+    assert digits(0xf7, 16) == [15, 7]
+    assert digits(0) == [0]
+    assert digits_to_number([1, 4, 3, 7]) == 1437
+    assert digits_to_number(iter([15, 7]), 16) == 0xf7
+    n = 7 ** 20000 + 12345
+    for base in [2, 3, 10, 16, 100]:
+        d = digits(n, base)
+        assert d[0] != 0
+        assert digits_to_number(d, base) == n
+        assert d[-4:] == digits(n % base ** 4, base)[-4:]
+    assert digits(n, 16) == [int(c, 16) for c in format(n, 'x')]
+
+
+def test_digital_root():
+    for n in range(1000):
+        for base in [2, 3, 10]:
+            m = n
+            while m >= base:
+                m = sum(digits(m, base))
+            assert digital_root(n, base) == m
+
+
 def test_prime_iterator():
     iter = prime_iterator(100)
     for p in primes:
@@ -56,6 +94,54 @@ def test_iter_primes():
     ]
 
 
+def test_iter_primes_unbounded():
+    for segment_size in [1, 2, 5, 64, 1 << 16]:
+        it = iter_primes_unbounded(segment_size)
+        assert list(itertools.islice(it, len(primes))) == primes
+    expected = list(iter_primes(200000))
+    it = iter_primes_unbounded(1000)
+    assert list(itertools.islice(it, len(expected))) == expected
+
+
+def simple_sieve(n):
+    sieve = [1] * n
+    for i in range(2, n):
+        if sieve[i]:
+            for j in range(i * i, n, i):
+                sieve[j] = 0
+    return [i for i in range(2, n) if sieve[i]]
+
+
+def test_prime_iterator_matches_simple_sieve():
+    expected = simple_sieve(2000)[:200]
+    for n in range(3, 60):
+        assert list(itertools.islice(prime_iterator(n), 200)) == expected
+
+
+def test_wheel_sieves_match_simple_sieve():
+    expected = simple_sieve(20000)
+    for n in itertools.chain(range(200), [961, 1000, 19999, 20000]):
+        assert list(iter_primes(n)) == [p for p in expected if p < n]
+    for m in [3, 4, 8, 30, 31, 100, 141]:
+        p = [q for q in expected if q < m]
+        for n in [m, m + 1, m + 29, m + 30, m + 31, p[-1] ** 2]:
+            p = [q for q in expected if q < m]
+            more_primes(p, n)
+            assert p == [q for q in expected if q < max(m, n)]
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_primes_range(processes):
+    expected = simple_sieve(200000)
+    for lo, hi in [(0, 200000), (0, 2), (5, 6), (100, 1000), (150000, 10)]:
+        ps = [p for p in expected if lo <= p < hi]
+        twins = sum(1 for p, q in zip(ps, ps[1:]) if q - p == 2)
+        assert list(iter_primes_range(lo, hi, processes, 1000)) == ps
+        assert count_primes_range(lo, hi, processes, 1000) == len(ps)
+        assert sum_primes_range(lo, hi, processes, 1000) == sum(ps)
+        assert count_twin_primes_range(lo, hi, processes, 1000) == twins
+
+
 def test_more_primes():
     lt = lambda x: lambda y: y < x
     primes_lt100 = list(itertools.takewhile(lt(100), primes))
@@ -110,6 +196,34 @@ def test_is_prime():
     assert not is_prime(310367)
 
 
+@pytest.mark.parametrize('processes', [1, 2])
+def test_is_prime_many(processes):
+    prime_set = set(primes)
+    dense = list(range(-3, 1000))
+    assert list(is_prime_many(dense, processes)) == [
+        int(n in prime_set) for n in dense]
+    sparse = [2, 997, 1009, 10 ** 12, 10 ** 12 + 39, 3215031751,
+              2 ** 61 - 1, (2 ** 31 - 1) * (2 ** 61 - 1), 2 ** 89 - 1,
+              2 ** 89 + 1]
+    assert list(is_prime_many(sparse, processes)) == [
+        1, 1, 1, 0, 1, 0, 1, 0, 1, 0]
+    assert is_prime_many([]) == bytearray()
+    assert is_prime_many([-5]) == bytearray(1)
+    assert is_prime_many([-5, -3, -1]) == bytearray(3)
+
+
+def test_is_prime_many_sparse_large():
+    # A few large numbers must not sieve the base primes up to their
+    # square root.
+    numbers = [10 ** 14 + 31, 2 ** 47 - 115, 2 ** 47 - 113]
+    expected = [int(is_prime(n)) for n in numbers]
+    is_prime_many([1009])   # builds the table of primes below 1000
+    with profiling.instrumented() as registry:
+        assert list(is_prime_many(numbers[:1])) == expected[:1]
+        assert list(is_prime_many(numbers[1:])) == expected[1:]
+    assert 'sieve.segments' not in registry.counters
+
+
 def test_factorize():
     assert list(factorize(1)) == []
     assert list(factorize(2)) == [(2, 1)]
@@ -120,6 +234,22 @@ def test_factorize():
     assert list(factorize(15750)) == [(2, 1), (3, 2), (5, 3), (7, 1)]
 
 
+def test_divisors():
+    for n in itertools.chain(range(1, 500), [720720, 2 ** 20, 9699690]):
+        expected = sorted(set(
+            x for d in range(1, int(n ** 0.5) + 1) if n % d == 0
+            for x in (d, n // d)))
+        factors = factorize(n)
+        assert divisors(n) == expected
+        assert divisors(None, factors) == expected
+        assert list(iter_divisors(n)) == expected
+        assert divisors_up_to(n, 30) == [d for d in expected if d <= 30]
+        assert divisors_in_range(n, 7, 1000, factors) == [
+            d for d in expected if 7 <= d < 1000]
+    assert divisors_up_to(60, 0) == []
+    assert divisors_in_range(60, 5, 5) == []
+
+
 def test_count_divisors():
     assert count_divisors(1) == 1
     assert count_divisors(2) == 2
@@ -136,3 +266,166 @@ def test_binomial_coefficient():
     assert binomial_coefficient(10, 3) == 120
     assert binomial_coefficient(43, 21) == 1052049481860
     assert binomial_coefficient(121, 97) == 13562231801970983941985175
+
+
+def test_product():
+    assert product([]) == 1
+    assert product(range(1, 6)) == 120
+    assert product(range(1, 6), 7) == 1
+    assert product(iter(range(1, 1000))) == math.factorial(999)
+    assert product(range(1, 1000), 10 ** 9 + 7) == (
+        math.factorial(999) % (10 ** 9 + 7))
+
+
+def test_factorial():
+    for n in [0, 1, 10, 19, 20, 21, 100, 2021]:
+        assert factorial(n) == math.factorial(n)
+        assert factorial(n, 1) == 0
+        assert factorial(n, 10 ** 9 + 7) == math.factorial(n) % (10 ** 9 + 7)
+    with pytest.raises(ValueError):
+        factorial(-1)
+    with profiling.instrumented() as registry:
+        assert factorial(19) == math.factorial(19)
+    assert 'sieve.segments' not in registry.counters
+
+
+def test_multinomial_coefficient():
+    assert multinomial_coefficient(5, [2, 2, 1]) == 30
+    assert multinomial_coefficient(0, []) == 1
+    assert multinomial_coefficient(10, [3, 7]) == 120
+    assert multinomial_coefficient(10, [3, 7], 7) == 1
+    ks = [0, 1, 5, 12, 31, 31]
+    c = math.factorial(80)
+    for k in ks:
+        c //= math.factorial(k)
+    assert multinomial_coefficient(80, ks) == c
+
+
+def test_partition_table():
+    assert partition_table(7) == [1, 1, 2, 3, 5, 7, 11, 15]
+    assert partition_count(100) == 190569292
+    assert partition_count(0) == 1
+    table = partition_table(3000)
+    for mod in [2, 10 ** 9 + 7, 2 ** 100 + 277]:
+        assert partition_table(3000, mod) == [x % mod for x in table]
+    assert partition_count(3000, 10 ** 9 + 7) == table[-1] % (10 ** 9 + 7)
+
+
+def test_restricted_partition_table():
+    assert restricted_partition_table(10, [2, 5]) == [
+        1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 2]
+    coins = [1, 2, 5, 10, 20, 50, 100, 200]
+    assert restricted_partition_table(200, coins)[200] == 73682
+    assert restricted_partition_table(200, coins, 1000)[200] == 682
+    assert restricted_partition_table(100, range(1, 101)) == (
+        partition_table(100))
+    with pytest.raises(ValueError):
+        restricted_partition_table(10, [0, 1])
+
+
+def test_crt():
+    assert crt([2, 3, 2], [3, 5, 7]) == (23, 105)
+    assert crt([3, 5], [4, 6]) == (11, 12)
+    assert crt([1, 2], [4, 6]) is None
+    assert crt([], []) == (0, 1)
+
+
+def test_sqrt_mod():
+    assert sqrt_mod(2, 7) == [3, 4]
+    assert sqrt_mod(3, 7) == []
+    assert sqrt_mod(4, 15) == [2, 7, 8, 13]
+    for n in range(1, 130):
+        for a in range(n):
+            assert sqrt_mod(a, n) == [x for x in range(n)
+                                      if (x * x - a) % n == 0]
+    p = 10 ** 9 + 9
+    assert sqrt_mod(123456789 ** 2, p) == sorted([123456789, p - 123456789])
+
+
+def test_primitive_root():
+    assert primitive_root(7) == 3
+    assert primitive_root(8) is None
+    assert primitive_root(10 ** 9 + 7) == 5
+    assert primitive_root(2 * 5 ** 3) == 3
+    # A prime modulus below 2 ** 48 must not be tested by sieving.
+    p = 2 ** 48 - 59
+    with profiling.instrumented() as registry:
+        assert primitive_root(p) == 2
+        assert sqrt_mod(4, p) == [2, p - 2]
+    assert 'sieve.segments' not in registry.counters
+    for n in range(2, 100):
+        units = [a for a in range(n) if math.gcd(a, n) == 1]
+        orders = [multiplicative_order(a, n) for a in units]
+        for a, k in zip(units, orders):
+            assert pow(a, k, n) == 1 % n
+            assert all(pow(a, j, n) != 1 for j in range(1, k))
+        g = primitive_root(n)
+        if len(units) in orders:
+            assert g == units[orders.index(len(units))]
+        else:
+            assert g is None
+
+
+def test_discrete_log():
+    assert discrete_log(3, 13, 17) == 4
+    assert discrete_log(2, 3, 7) is None
+    for m in range(1, 40):
+        for a in range(m):
+            for b in range(m):
+                powers = [pow(a, x, m) for x in range(2 * m)]
+                x = discrete_log(a, b, m)
+                if b in powers:
+                    assert x == powers.index(b)
+                else:
+                    assert x is None
+    p = 2 ** 61 - 1
+    assert discrete_log(37, pow(37, 10 ** 17, p), p) == 10 ** 17
+    p = 10 ** 9 + 7
+    assert discrete_log(5, pow(5, 123456789, p), p, max_table=100) == (
+        123456789)
+
+
+def test_farey_neighbors():
+    assert farey_neighbors(3, 7, 8) == ((2, 5), (1, 2))
+    assert farey_neighbors(1, 3, 4) == ((1, 4), (1, 2))
+    assert farey_neighbors(0, 1, 5) == (None, (1, 5))
+    assert farey_neighbors(3, 7, 10 ** 6)[0] == (428570, 999997)
+    assert farey_neighbors(7, 3, 2) == ((2, 1), (5, 2))
+    for n in range(1, 12):
+        f = list(iter_farey(n))
+        for left, x, right in zip(f, f[1:], f[2:]):
+            assert farey_neighbors(x[0], x[1], n) == (left, right)
+
+
+def test_iter_farey():
+    assert list(iter_farey(5, (1, 3), (1, 2))) == [(1, 3), (2, 5), (1, 2)]
+    assert list(iter_farey(3)) == [(0, 1), (1, 3), (1, 2), (2, 3), (1, 1)]
+    for n in range(1, 20):
+        f = sorted({(fractions.Fraction(p, q), p // math.gcd(p, q),
+                     q // math.gcd(p, q))
+                    for q in range(1, n + 1) for p in range(q + 1)})
+        assert list(iter_farey(n)) == [(p, q) for _, p, q in f]
+        assert list(iter_farey(n, (2, 14), (6, 8))) == [
+            (p, q) for x, p, q in f
+            if fractions.Fraction(1, 7) <= x <= fractions.Fraction(3, 4)]
+
+
+def test_best_rational_approximation():
+    assert best_rational_approximation(314159, 100000, 100) == (311, 99)
+    assert best_rational_approximation(1, 2, 1) == (0, 1)
+    assert best_rational_approximation(6, 4, 10) == (3, 2)
+    for p in range(0, 50):
+        x = fractions.Fraction(p, 37)
+        for n in range(1, 10):
+            assert fractions.Fraction(*best_rational_approximation(
+                p, 37, n)) == x.limit_denominator(n)
+
+
+def test_floor_sum():
+    assert floor_sum(4, 3, 2, 1) == 4
+    for n in range(8):
+        for m in range(1, 6):
+            for a in range(-7, 8):
+                for b in range(-7, 8):
+                    assert floor_sum(n, m, a, b) == sum(
+                        (a * i + b) // m for i in range(n))
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+from eulerlib import polynomial
+from eulerlib.polynomial import (NTT_PRIMES, multiply, ntt_multiply, power,
+                                 series_exp, series_inverse, series_log)
+
+
+def schoolbook(a, b, mod=None):
+    c = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            c[i + j] += x * y
+    return c if mod is None else [x % mod for x in c]
+
+
+def test_multiply():
+    assert multiply([1, 1], [1, 2, 1]) == [1, 3, 3, 1]
+    assert multiply([], [1]) == []
+    rng = random.Random(0)
+    for _ in range(20):
+        a = [rng.randrange(10 ** rng.randint(1, 15))
+             for _ in range(rng.randint(1, 200))]
+        b = [rng.randrange(10 ** rng.randint(1, 15))
+             for _ in range(rng.randint(1, 200))]
+        assert multiply(a, b) == schoolbook(a, b)
+        for mod in [7, 10 ** 9 + 7, 2 ** 127 - 1]:
+            assert multiply(a, b, mod) == schoolbook(a, b, mod)
+    with pytest.raises(ValueError):
+        multiply([1, -1], [1])
+    assert multiply([1, -1], [1, 1], 5) == [1, 0, 4]
+
+
+@pytest.mark.parametrize('mod', [NTT_PRIMES[0], 10 ** 9 + 7, 2])
+def test_ntt_multiply(mod):
+    rng = random.Random(1)
+    for n, m in [(1, 1), (3, 5), (64, 64), (100, 300)]:
+        a = [rng.randrange(mod) for _ in range(n)]
+        b = [rng.randrange(mod) for _ in range(m)]
+        assert ntt_multiply(a, b, mod) == schoolbook(a, b, mod)
+    with pytest.raises(ValueError):
+        ntt_multiply([1], [1], 2 ** 64)
+
+
+def test_ntt_length_limit(monkeypatch):
+    assert [polynomial._max_ntt_length(p) for p in NTT_PRIMES] == [
+        2 ** 23, 2 ** 25, 2 ** 26]
+    monkeypatch.setattr(polynomial, '_max_ntt_length', lambda p: 64)
+    a = list(range(40))
+    for mod in [NTT_PRIMES[0], 10 ** 9 + 7]:
+        with pytest.raises(ValueError):
+            ntt_multiply(a, a, mod)
+    monkeypatch.setattr(polynomial, 'optional_import', lambda name: None)
+    assert multiply(a, a, 10 ** 9 + 7) == schoolbook(a, a, 10 ** 9 + 7)
+
+
+def test_power():
+    assert power([1, 1], 3) == [1, 3, 3, 1]
+    assert power([1, 1], 0) == [1]
+    assert power([1, 1], 0, n=0) == []
+    assert power([1, 1], 5, 7, 2) == [1, 5]
+    dice = [0, 1, 1, 1, 1, 1, 1]
+    assert power(dice, 2) == [0, 0, 1, 2, 3, 4, 5, 6, 5, 4, 3, 2, 1]
+    assert power(dice, 10)[35] == 4395456
+    assert power(dice, 100, 10 ** 9 + 7, 50) == [
+        x % (10 ** 9 + 7) for x in power(dice, 100)[:50]]
+
+
+def test_power_series():
+    p = NTT_PRIMES[0]
+    assert series_inverse([1, -1], 5, 7) == [1, 1, 1, 1, 1]
+    assert series_log([1, 1], 4, p) == [0, 1, p - (p + 1) // 2, (p + 1) // 3]
+    assert series_exp([0, 1], 4, p) == [1, 1, (p + 1) // 2, (p + 1) // 6]
+    rng = random.Random(2)
+    a = [1] + [rng.randrange(p) for _ in range(99)]
+    inverse = series_inverse(a, 100, p)
+    assert multiply(a, inverse, p)[:100] == [1] + [0] * 99
+    assert series_exp(series_log(a, 100, p), 100, p) == a
+    with pytest.raises(ValueError):
+        series_inverse([0, 1], 3, p)
+    with pytest.raises(ValueError):
+        series_log([1, 1], 8, 7)
+    with pytest.raises(ValueError):
+        series_exp([0, 1], 8, 7)
+    assert series_exp([0, 1], 7, 7) == [1, 1, 4, 6, 5, 1, 6]
+
+
+def test_partitions_from_series():
+    # 1 / ((1 - x) (1 - x ** 2) ...) = exp(sum of sigma(k) x ** k / k)
+    n = 200
+    p = NTT_PRIMES[0]
+    pentagonal = [0] * n
+    for k in range(-20, 21):
+        g = k * (3 * k - 1) // 2
+        if g < n:
+            pentagonal[g] = -1 if k % 2 else 1
+    partitions = series_inverse(pentagonal, n, p)
+    assert partitions[100] == 190569292
+    sigma = [0] * n
+    for d in range(1, n):
+        for k in range(d, n, d):
+            sigma[k] += d
+    log = [s * pow(k, p - 2, p) % p if k else 0 for k, s in enumerate(sigma)]
+    assert series_exp(log, n, p) == partitions
+
+
+def test_multiply_without_c_decimal(monkeypatch):
+    monkeypatch.setattr(polynomial, 'optional_import', lambda name: None)
+    rng = random.Random(3)
+    a = [rng.randrange(10 ** 12) for _ in range(100)]
+    b = [rng.randrange(10 ** 12) for _ in range(70)]
+    assert multiply(a, b) == schoolbook(a, b)
+    assert multiply(a, b, 10 ** 9 + 7) == schoolbook(a, b, 10 ** 9 + 7)
+    assert multiply(a, b, 2 ** 61 - 1) == schoolbook(a, b, 2 ** 61 - 1)
@@ -0,0 +1,65 @@
+from itertools import islice
+
+from eulerlib import profiling
+from eulerlib.collections2 import BinaryHeap, FibonacciHeap
+from eulerlib.math2 import (factorize, iter_primes, iter_primes_unbounded,
+                            prime_iterator)
+
+
+def test_disabled_by_default():
+    profiling.registry.reset()
+    factorize(15750)
+    assert not profiling.enabled
+    assert profiling.registry.as_dict() == {'counters': {}, 'timings': {}}
+
+
+def test_instrumented():
+    with profiling.instrumented() as registry:
+        assert profiling.enabled
+        factorize(15750)
+        it = prime_iterator(100)
+        for _ in range(100):
+            next(it)
+        for queue in (BinaryHeap(), FibonacciHeap()):
+            for i in range(10):
+                queue.add((i + 10, i))
+            queue.decrease_key((19, 9), (0, 9))
+            while queue:
+                queue.pop()
+    assert not profiling.enabled
+    d = registry.as_dict()
+    counters = d['counters']
+    assert counters['factorize.calls'] == 1
+    assert counters['factorize.trial_divisions'] >= 4
+    assert counters['prime_iterator.augments'] >= 1
+    assert counters['sieve.segments'] >= 2
+    assert counters['heap.decrease_keys'] == 2
+    assert counters['heap.sift_steps'] > 0
+    assert counters['heap.links'] > 0
+    assert d['timings']['sieve']['count'] >= 2
+    assert d['timings']['factorize.trial_division']['count'] == 1
+
+
+def test_sieve_segments():
+    with profiling.instrumented() as registry:
+        list(iter_primes(10 ** 4))   # sieves below 10, 100 and 10 ** 4
+        assert registry.counters['sieve.segments'] == 3
+        registry.reset()
+        list(islice(iter_primes_unbounded(1000), 1000))
+        segments = registry.counters['sieve.segments']
+        assert segments >= 8
+        assert registry.timings['sieve'][0] == segments
+
+
+def test_to_prometheus():
+    registry = profiling.Registry()
+    registry.increment('heap.sift_steps', 3)
+    registry.record('sieve', 0.5)
+    registry.record('sieve', 0.25)
+    assert registry.to_prometheus().splitlines() == [
+        '# TYPE eulerlib_heap_sift_steps_total counter',
+        'eulerlib_heap_sift_steps_total 3',
+        '# TYPE eulerlib_sieve_seconds summary',
+        'eulerlib_sieve_seconds_count 2',
+        'eulerlib_sieve_seconds_sum 0.75',
+    ]